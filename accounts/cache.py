@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+# Logged in users are cached in the auth cache by primary key, see 
+# accounts.middleware. Anything that changes a user row, including the 
+# habits app's updates to active_habit_count, invalidates the entry.
+AUTH_CACHE = 'auth'
+
+
+def user_cache_key(pk) -> str:
+    return f'user:{pk}'
+
+
+def invalidate_users(*pks):
+    """
+    Drops the cached users, now and again once the current transaction 
+    commits, so a request that cached a user between the two doesn't keep 
+    the old row.
+    """
+
+    if not settings.USER_CACHE_TIMEOUT:
+        return
+
+    keys = [user_cache_key(pk) for pk in pks]
+    caches[AUTH_CACHE].delete_many(keys)
+    transaction.on_commit(lambda: caches[AUTH_CACHE].delete_many(keys))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from accounts.cache import AUTH_CACHE
+
+
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+CACHED_SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+
+@register(Tags.caches)
+def check_auth_cache_is_shared(app_configs, **kwargs):
+    """
+    Refuses to cache users or sessions in a per process auth cache, where a 
+    logout or password change seen by one worker would never reach the rest.
+    """
+
+    if settings.CACHES[AUTH_CACHE]['BACKEND'] != LOCAL_CACHE_BACKEND:
+        return []
+
+    errors = []
+
+    if settings.USER_CACHE_TIMEOUT > 0:
+        errors.append(Error(
+            'USER_CACHE_TIMEOUT needs an auth cache shared between workers.',
+            hint = "Set AUTH_CACHE_BACKEND to 'file', or USER_CACHE_TIMEOUT to 0.",
+            id = 'accounts.E001',
+        ))
+
+    if settings.SESSION_ENGINE == CACHED_SESSION_ENGINE:
+        errors.append(Error(
+            "SESSION_STORE 'cached_db' needs an auth cache shared between workers.",
+            hint = "Set AUTH_CACHE_BACKEND to 'file', or SESSION_STORE to 'db'.",
+            id = 'accounts.E002',
+        ))
+
+    return errors
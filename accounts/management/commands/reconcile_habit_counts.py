@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from accounts.cache import invalidate_users
+from habits.models import Habit
+
+
+class Command(BaseCommand):
+    help = (
+        "Resets each user's active habit count to the number of habits they "
+        "have that aren't deleted, where the two have drifted apart."
+    )
+
+
+    def handle(self, *args, **options):
+        active_habits = Habit.objects.filter(
+            owner=OuterRef('pk'), 
+            deleted=False,
+        ).order_by().values('owner').annotate(count=Count('pk')).values('count')
+        actual_count = Coalesce(Subquery(active_habits), Value(0))
+
+        users = get_user_model().objects
+        drifted = list(
+            users.exclude(active_habit_count=actual_count).values_list('pk', flat=True)
+        )
+
+        corrected = users.filter(pk__in=drifted).update(active_habit_count=actual_count)
+        invalidate_users(*drifted)
+
+        self.stdout.write(f'Corrected active habit counts for {corrected} users.')
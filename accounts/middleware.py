@@ -0,0 +1,71 @@
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from accounts.cache import AUTH_CACHE, user_cache_key
+
+
+def get_user(request):
+    """
+    Returns the request's user like django.contrib.auth.get_user, but from 
+    the auth cache when USER_CACHE_TIMEOUT is set. A cached user is only 
+    used if the session's backend is still allowed and its auth hash still 
+    matches, so logging out elsewhere or changing the password still ends 
+    the session; anything else falls back to the database.
+    """
+
+    timeout = settings.USER_CACHE_TIMEOUT
+
+    try:
+        user_id = request.session[SESSION_KEY]
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+
+    if not timeout or backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+
+    cache = caches[AUTH_CACHE]
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+
+    if user is not None:
+        session_hash = request.session.get(HASH_SESSION_KEY)
+        if session_hash and constant_time_compare(session_hash, user.get_session_auth_hash()):
+            return user
+
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, user, timeout)
+
+    return user
+
+
+def _get_user(request):
+    if not hasattr(request, '_cached_user'):
+        request._cached_user = get_user(request)
+    return request._cached_user
+
+
+async def _auser(request):
+    if not hasattr(request, '_acached_user'):
+        request._acached_user = await sync_to_async(get_user)(request)
+    return request._acached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware, loading the user through get_user above.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _get_user(request))
+        request.auser = partial(_auser, request)
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:02
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_active_habit_count(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Habit = apps.get_model('habits', 'Habit')
+
+    active_habits = Habit.objects.filter(
+        owner=OuterRef('pk'), 
+        deleted=False,
+    ).order_by().values('owner').annotate(count=Count('pk')).values('count')
+
+    CustomUser.objects.update(
+        active_habit_count=Coalesce(Subquery(active_habits), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_signupcode'),
+        ('habits', '0006_habit_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='active_habit_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_active_habit_count, migrations.RunPython.noop),
+    ]
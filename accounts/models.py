@@ -25,6 +25,9 @@ class CustomUser(AbstractUser):
     email = models.EmailField(unique=True)
 
     habit_limit = models.IntegerField(default=5)
+
+    # Number of habits that aren't deleted, maintained by the habits app.
+    active_habit_count = models.PositiveIntegerField(default=0, editable=False)
     
 
     USERNAME_FIELD = 'email'
@@ -42,8 +45,20 @@ class CustomUser(AbstractUser):
         return f'{self.email}'
     
 
+    def save(self, *args, **kwargs):
+        # active_habit_count is kept by F() updates, so a full save of a 
+        # loaded user, e.g. a password change, mustn't write back its copy.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields 
+                if not field.primary_key and field.name != 'active_habit_count'
+            ]
+
+        super().save(*args, **kwargs)
+
+
     def max_habits_created(self):
-        return self.all_habits.filter(deleted=False).count() >= self.habit_limit
+        return self.active_habit_count >= self.habit_limit
     
 
 
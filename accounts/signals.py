@@ -1,9 +1,16 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from allauth.account.models import EmailAddress
+from .cache import invalidate_users
 from .models import CustomUser
 
 
 @receiver(post_delete, sender=CustomUser)
 def delete_email_addresses(sender, instance, **kwargs):
     EmailAddress.objects.filter(user=instance).delete()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_users(instance.pk)
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.checks import check_auth_cache_is_shared
+
+
+@override_settings(USER_CACHE_TIMEOUT=300)
+class CachedAuthenticationMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            first_name = 'Test',
+            last_name = 'User',
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+
+        self.client.force_login(self.user)
+
+
+    def test_cached_user_is_reloaded_after_save(self):
+        """
+        Test a saved user replaces the cached one on the next request.
+        """
+
+        self.client.get(reverse('create_habit'))
+
+        self.user.first_name = 'Changed'
+        self.user.save()
+
+        response = self.client.get(reverse('create_habit'))
+        self.assertEqual(response.context['user'].first_name, 'Changed')
+
+
+    def test_password_change_ends_cached_session(self):
+        """
+        Test a password changed elsewhere logs out sessions made with the old 
+        one, even once the new user is cached.
+        """
+
+        self.client.get(reverse('create_habit'))
+
+        self.user.set_password('NewPass123')
+        self.user.save()
+        other_client = self.client_class()
+        other_client.force_login(self.user)
+        other_client.get(reverse('create_habit'))
+
+        response = self.client.get(reverse('create_habit'))
+        self.assertEqual(response.status_code, 302)
+
+
+
+class AuthCacheCheckTests(SimpleTestCase):
+
+    def test_check_refuses_cached_users_in_local_memory(self):
+        """
+        Test caching users in a per process auth cache fails the system check.
+        """
+
+        with override_settings(USER_CACHE_TIMEOUT=300):
+            errors = check_auth_cache_is_shared(None)
+
+        self.assertEqual([error.id for error in errors], ['accounts.E001'])
+
+
+    def test_check_refuses_cached_sessions_in_local_memory(self):
+        """
+        Test cached_db sessions in a per process auth cache fail the system 
+        check.
+        """
+
+        engine = 'django.contrib.sessions.backends.cached_db'
+        with override_settings(SESSION_ENGINE=engine):
+            errors = check_auth_cache_is_shared(None)
+
+        self.assertEqual([error.id for error in errors], ['accounts.E002'])
+
+
+    def test_check_allows_shared_auth_cache(self):
+        """
+        Test a file based auth cache passes the check with caching turned on.
+        """
+
+        caches = {
+            **settings.CACHES,
+            'auth': {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': '/tmp/habit_auth_check',
+            },
+        }
+        with override_settings(CACHES=caches, USER_CACHE_TIMEOUT=300):
+            errors = check_auth_cache_is_shared(None)
+
+        self.assertEqual(errors, [])
@@ -1,4 +1,7 @@
+from io import StringIO
+
 from django.test import TestCase
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Permission
 
@@ -77,6 +80,64 @@ class CustomUserModelTests(TestCase):
         self.assertEqual(str(self.admin_user), self.admin_user.email)
 
 
+    def test_active_habit_count(self):
+        """
+        Test the active habit count follows habits being created and soft 
+        deleted, and drives max_habits_created.
+        """
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_habit_count, 2)
+        self.assertFalse(self.user.max_habits_created())
+
+        self.habit_1.soft_delete()
+        self.habit_1.soft_delete()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_habit_count, 1)
+
+        self.user.habit_limit = 1
+        self.assertTrue(self.user.max_habits_created())
+
+
+    def test_active_habit_count_survives_user_save_and_restore(self):
+        """
+        Test saving a loaded user doesn't write back a stale active habit 
+        count, and restoring a deleted habit, as in the admin, counts it again.
+        """
+
+        stale_user = get_user_model().objects.get(pk=self.user.pk)
+        self.habit_1.soft_delete()
+        stale_user.set_password('NewPass123')
+        stale_user.save()
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_habit_count, 1)
+
+        self.habit_1.deleted = False
+        self.habit_1.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_habit_count, 2)
+
+        self.habit_1.name = 'Renamed'
+        self.habit_1.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_habit_count, 2)
+
+        self.habit_1.deleted = True
+        self.habit_1.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_habit_count, 1)
+
+
+    def test_reconcile_habit_counts_command(self):
+        get_user_model().objects.filter(pk=self.user.pk).update(active_habit_count=7)
+
+        call_command('reconcile_habit_counts', stdout=StringIO())
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.active_habit_count, 2)
+
+
     def max_habits_created(self):
         """
         Tests the max habits created method.
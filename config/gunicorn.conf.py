@@ -0,0 +1,31 @@
+"""
+Gunicorn config for serving the WSGI application in production:
+
+    gunicorn config.wsgi:application -c config/gunicorn.conf.py
+
+Each setting can be overridden from the environment.
+"""
+
+import multiprocessing, os
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Threaded workers, so a worker waiting on the database keeps serving. Each 
+# thread holds its own persistent database connection, so workers x threads 
+# should stay below the database's max_connections.
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Seconds an idle keep-alive connection is held, for clients behind a proxy.
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+
+# Recycle workers now and then, staggered, to bound any memory growth.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+
+# Set empty to turn the access log off.
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
@@ -49,24 +49,45 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     "allauth.account.middleware.AccountMiddleware",
     'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+# Per request timing and query metrics, see core.middleware.
+REQUEST_METRICS = env.bool("REQUEST_METRICS", default=True)
+
+# Serve the habit pages and toggle with their async versions, for running 
+# under an ASGI server, see habits.async_views.
+HABITS_ASYNC_VIEWS = env.bool("HABITS_ASYNC_VIEWS", default=False)
+
+# Retention for the archive_deleted_habits command: days a habit stays soft 
+# deleted before it is archived, and a synced operation's key is kept.
+HABITS_ARCHIVE_AFTER_DAYS = env.int("HABITS_ARCHIVE_AFTER_DAYS", default=30)
+SYNCED_OPERATION_RETENTION_DAYS = env.int("SYNCED_OPERATION_RETENTION_DAYS", default=30)
+
 ROOT_URLCONF = 'config.urls'
 
+# Templates are read from disk on every render in development. Otherwise 
+# each worker compiles them once and keeps them, and with TEMPLATE_WARMUP 
+# compiles the app's templates at startup, see core.warmup.
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [str(BASE_DIR.joinpath('templates'))],
-        'APP_DIRS': True,
+        'APP_DIRS': False,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -74,10 +95,15 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
         },
     },
 ]
 
+TEMPLATE_WARMUP = env.bool("TEMPLATE_WARMUP", default=not DEBUG)
+
 WSGI_APPLICATION = 'config.wsgi.application'
 
 
@@ -110,6 +136,89 @@ else:
     }
 
 
+# Connections
+# By default each worker thread keeps its connection open for 
+# DATABASE_CONN_MAX_AGE seconds, checked before reuse. Under ASGI, where 
+# requests don't reuse threads, set DATABASE_POOL to share a psycopg pool 
+# per worker process instead; pooled connections can't also be persistent. 
+# Without the pool, async views close their connections after each request, 
+# as every request would otherwise leave one open on a new thread.
+
+DATABASE_POOL = env.bool("DATABASE_POOL", default=False)
+
+DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+if DATABASE_POOL:
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': env.int("DATABASE_POOL_MIN_SIZE", default=2),
+            'max_size': env.int("DATABASE_POOL_MAX_SIZE", default=10),
+            'timeout': env.float("DATABASE_POOL_TIMEOUT", default=10.0),
+        },
+    }
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = env.int(
+        "DATABASE_CONN_MAX_AGE", default=0 if HABITS_ASYNC_VIEWS else 60,
+    )
+
+
+# Cache
+# Rendered habit grids use their own cache, which can be local memory 
+# (per worker) or file based (shared between workers on one host).
+
+GRID_CACHE_BACKEND = env.str("GRID_CACHE_BACKEND", default="locmem")
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'grids': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'habit-grids',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+if GRID_CACHE_BACKEND == 'file':
+    CACHES['grids'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env.str("GRID_CACHE_LOCATION", default='/var/tmp/habit_grids'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+
+# Sessions and authentication
+# SESSION_STORE picks the session backend: 'db', 'cached_db' (read through 
+# the auth cache) or 'signed_cookies' (no storage, but sessions can't be 
+# revoked server side). USER_CACHE_TIMEOUT, when set, caches each logged in 
+# user for that many seconds, see accounts.middleware. Both rely on the auth 
+# cache, so they need AUTH_CACHE_BACKEND set to 'file', or a logout or 
+# change seen by one worker won't reach the others; accounts.checks refuses 
+# to start otherwise.
+
+SESSION_STORE = env.str("SESSION_STORE", default="db")
+SESSION_ENGINE = f'django.contrib.sessions.backends.{SESSION_STORE}'
+SESSION_CACHE_ALIAS = 'auth'
+
+USER_CACHE_TIMEOUT = env.int("USER_CACHE_TIMEOUT", default=0)
+
+AUTH_CACHE_BACKEND = env.str("AUTH_CACHE_BACKEND", default="locmem")
+
+CACHES['auth'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'habit-auth',
+    'OPTIONS': {'MAX_ENTRIES': 10000},
+}
+
+if AUTH_CACHE_BACKEND == 'file':
+    CACHES['auth'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env.str("AUTH_CACHE_LOCATION", default='/var/tmp/habit_auth'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -15,6 +15,7 @@ DEBUG = env.bool("DJANGO_DEBUG", default=False)
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('accounts.urls')),
+    path('core/', include('core.urls')),
     path('', include('habits.urls')),
 ]
 
@@ -0,0 +1,172 @@
+import threading, time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+
+# Upper bounds, in milliseconds, of the request time histogram buckets.
+HISTOGRAM_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class RequestMetrics:
+    """
+    Request time histograms and query totals, aggregated per URL name. Each
+    worker process keeps its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+
+    def record(self, name, total_ms, db_ms, queries):
+        with self._lock:
+            view = self._views.get(name)
+            if view is None:
+                view = self._views[name] = {
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'db_ms': 0.0,
+                    'queries': 0,
+                    'buckets': [0] * (len(HISTOGRAM_BUCKETS) + 1),
+                }
+
+            view['count'] += 1
+            view['total_ms'] += total_ms
+            view['max_ms'] = max(view['max_ms'], total_ms)
+            view['db_ms'] += db_ms
+            view['queries'] += queries
+            view['buckets'][self._bucket(total_ms)] += 1
+
+
+    def snapshot(self) -> dict:
+        """
+        Returns a copy of the metrics, with per request averages.
+        """
+
+        labels = [f'<={bound}ms' for bound in HISTOGRAM_BUCKETS] + ['+Inf']
+
+        with self._lock:
+            return {
+                name: {
+                    'count': view['count'],
+                    'mean_ms': round(view['total_ms'] / view['count'], 3),
+                    'max_ms': round(view['max_ms'], 3),
+                    'mean_db_ms': round(view['db_ms'] / view['count'], 3),
+                    'mean_queries': round(view['queries'] / view['count'], 2),
+                    'histogram': dict(zip(labels, view['buckets'])),
+                }
+                for name, view in self._views.items()
+            }
+
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+    @staticmethod
+    def _bucket(total_ms) -> int:
+        for i, bound in enumerate(HISTOGRAM_BUCKETS):
+            if total_ms <= bound:
+                return i
+        return len(HISTOGRAM_BUCKETS)
+
+
+request_metrics = RequestMetrics()
+
+
+class QueryTimer:
+    """
+    Database execute wrapper that counts queries and sums their time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def _add_execute_wrapper(wrapper):
+    connection.execute_wrappers.append(wrapper)
+
+
+def _remove_execute_wrapper(wrapper):
+    connection.execute_wrappers.remove(wrapper)
+
+
+class RequestMetricsMiddleware:
+    """
+    Times each request and its database queries, aggregating them per URL 
+    name, and reporting them in a Server-Timing header with DEBUG on or to 
+    staff users. Cheap enough to run with DEBUG off; disable with the 
+    REQUEST_METRICS setting.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = QueryTimer()
+        start = time.perf_counter()
+
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+
+        return self.finish(request, response, timer, start, getattr(request, 'user', None))
+
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+
+        # Async ORM queries run in the request's thread sensitive worker 
+        # thread, on that thread's connection, so the timer is added there.
+        await sync_to_async(_add_execute_wrapper)(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(_remove_execute_wrapper)(timer)
+
+        user = await request.auser() if hasattr(request, 'auser') else None
+
+        return self.finish(request, response, timer, start, user)
+
+
+    def finish(self, request, response, timer, start, user):
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = timer.duration * 1000
+
+        if settings.DEBUG or getattr(user, 'is_staff', False):
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{timer.count} queries", '
+                f'total;dur={total_ms:.1f}'
+            )
+
+        match = request.resolver_match
+        if match and match.url_name:
+            request_metrics.record(match.url_name, total_ms, db_ms, timer.count)
+
+        return response
@@ -0,0 +1,107 @@
+{% load static %}// Caches the app shell so habit pages open offline. Static assets are served
+// from the cache and refreshed in the background, pages from the network
+// with the last copy as a fallback. Toggles made offline are queued by
+// js/script.js, not here.
+
+const STATIC_CACHE = 'habit-static-v1';
+const PAGE_CACHE = 'habit-pages-v1';
+
+const STATIC_URL = '{% get_static_prefix %}';
+const STATIC_ASSETS = [
+    '{% static "css/style.css" %}',
+    '{% static "js/script.js" %}',
+    '{% static "icons/favicon.ico" %}',
+];
+const CDN_HOSTS = [
+    'unpkg.com',
+    'cdn.jsdelivr.net',
+    'fonts.googleapis.com',
+    'fonts.gstatic.com',
+];
+const OFFLINE_PAGE = '{% url "home" %}';
+
+
+self.addEventListener('install', (event) => {
+    event.waitUntil(
+        caches.open(STATIC_CACHE)
+            .then((cache) => cache.addAll(STATIC_ASSETS))
+            .then(() => self.skipWaiting())
+    );
+});
+
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then((keys) => Promise.all(
+                keys
+                    .filter((key) => ![STATIC_CACHE, PAGE_CACHE].includes(key))
+                    .map((key) => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+
+// Pages hold the user's habits, so they are dropped on logout.
+self.addEventListener('message', (event) => {
+    if (event.data === 'clear-pages') {
+        event.waitUntil(caches.delete(PAGE_CACHE));
+    }
+});
+
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (request.method !== 'GET') {
+        return;
+    }
+
+    if (url.origin === self.location.origin && url.pathname.startsWith(STATIC_URL)) {
+        event.respondWith(staleWhileRevalidate(event));
+    } else if (CDN_HOSTS.includes(url.hostname)) {
+        event.respondWith(staleWhileRevalidate(event));
+    } else if (url.origin === self.location.origin && request.mode === 'navigate') {
+        event.respondWith(networkFirst(request));
+    }
+});
+
+
+async function staleWhileRevalidate(event) {
+    const cache = await caches.open(STATIC_CACHE);
+    const cached = await cache.match(event.request);
+
+    const fetched = fetch(event.request).then((response) => {
+        if (response.ok || response.type === 'opaque') {
+            cache.put(event.request, response.clone());
+        }
+        return response;
+    });
+
+    if (cached) {
+        event.waitUntil(fetched.catch(() => {}));
+        return cached;
+    }
+    return fetched;
+}
+
+
+async function networkFirst(request) {
+    const cache = await caches.open(PAGE_CACHE);
+
+    try {
+        const response = await fetch(request);
+        if (response.ok && !response.redirected) {
+            cache.put(request, response.clone());
+        }
+        return response;
+    } catch (error) {
+        return (
+            await cache.match(request)
+            || await cache.match(OFFLINE_PAGE)
+            || Response.error()
+        );
+    }
+}
@@ -0,0 +1,40 @@
+from django import template
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+
+register = template.Library()
+
+
+def grid_cell(habit_id, cell, oob=False) -> str:
+    """
+    Returns a grid cell's markup, identical to habits/partials/day.html.
+    """
+
+    cell_id = 'today' if cell['is_today'] else cell['date']
+    swap = f'hx-swap-oob="outerHTML:#grid-{habit_id} [id=\'{cell_id}\']" ' if oob else ''
+
+    if cell['completed']:
+        colour = 'bg-pink-800'
+    elif cell['is_past']:
+        colour = 'bg-zinc-700'
+    else:
+        colour = 'bg-zinc-800'
+
+    pulse = 'animate-pulse' if cell['is_today'] else ''
+
+    return (
+        f'<div id="{cell_id}" {swap}class="aspect-square {colour} {pulse} transition"></div>'
+    )
+
+
+@register.simple_tag
+def grid_cells(date_grid, habit, oob=False):
+    """
+    Renders every cell of a habit's grid in one pass, rather than including 
+    day.html once per cell, which costs a template lookup and context push 
+    for each of up to 365 cells.
+    """
+
+    habit_id = escape(habit.pk)
+    return mark_safe('\n'.join(grid_cell(habit_id, cell, oob) for cell in date_grid))
@@ -1,3 +1,147 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from core.middleware import request_metrics, HISTOGRAM_BUCKETS
+from core.warmup import warm_up
+from habits.grid import HabitGrid, current_day
+from habits.models import Habit
+
+
+class RequestMetricsMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            first_name = 'Test',
+            last_name = 'User',
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+
+        self.habit = Habit.objects.create(
+            owner = self.user,
+            name = 'A Test Habit',
+            duration = 7,
+        )
+
+        request_metrics.reset()
+
+
+    def test_server_timing_header(self):
+        """
+        Test responses to staff report total and database time, including the 
+        number of queries made, and other users' responses don't.
+        """
+
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('habit', kwargs={'pk': self.habit.pk}))
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(request_metrics.snapshot()['habit']['count'], 1)
+
+        get_user_model().objects.filter(pk=self.user.pk).update(is_staff=True)
+
+        response = self.client.get(reverse('habit', kwargs={'pk': self.habit.pk}))
+        self.assertRegex(
+            response['Server-Timing'], 
+            r'^db;dur=[\d.]+;desc="3 queries", total;dur=[\d.]+$',
+        )
+
+
+    def test_metrics_aggregated_per_url_name(self):
+        self.client.force_login(self.user)
+
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        self.client.post(reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk}))
+
+        metrics = request_metrics.snapshot()
+
+        self.assertEqual(metrics['home']['count'], 2)
+        self.assertEqual(metrics['home']['mean_queries'], 3)
+        self.assertEqual(sum(metrics['home']['histogram'].values()), 2)
+        self.assertEqual(len(metrics['home']['histogram']), len(HISTOGRAM_BUCKETS) + 1)
+        self.assertEqual(metrics['habit_completed_day_toggle']['count'], 1)
+
+
+    def test_metrics_view_staff_only(self):
+        """
+        Test the metrics endpoint is only available to staff users.
+        """
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+
+        response = self.client.get(reverse('request_metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('request_metrics', response.json())
+
+        response = self.client.post(reverse('request_metrics'))
+        self.assertEqual(response.json(), {})
+
+
+class ServiceWorkerViewTests(TestCase):
+
+    def test_service_worker_served_for_whole_site(self):
+        """
+        Test the service worker is served as JavaScript, allowed to control 
+        the whole site, with the static assets it caches.
+        """
+
+        response = self.client.get(reverse('service_worker'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/javascript')
+        self.assertEqual(response['Service-Worker-Allowed'], '/')
+        self.assertContains(response, '/static/css/style.css')
+
+
+class GridCellsTagTests(SimpleTestCase):
+
+    def test_grid_cells_match_day_partial(self):
+        """
+        Test the grid_cells tag renders the same cells as including 
+        habits/partials/day.html for each, with and without oob.
+        """
+
+        habit = Habit(id=uuid.uuid4())
+        date_grid = HabitGrid(current_day() - timedelta(days=3), 7, 0b0101)
+        template = Template('{% load grid_tags %}{% grid_cells date_grid habit oob=oob %}')
+
+        for oob in (False, True):
+            cells = [
+                render_to_string('habits/partials/day.html', {'data': data, 'habit': habit, 'oob': oob})
+                for data in date_grid
+            ]
+            rendered = template.render(Context({'date_grid': date_grid, 'habit': habit, 'oob': oob}))
+
+            self.assertEqual(rendered, '\n'.join(cells))
+            self.assertEqual(rendered.count('id="today"'), 1)
+
+
+class WarmUpTests(SimpleTestCase):
+
+    @override_settings(TEMPLATE_WARMUP=True)
+    def test_warm_up_compiles_project_templates(self):
+        """
+        Test every project template is compiled.
+        """
+
+        with self.assertLogs('core.warmup', 'INFO') as logs:
+            compiled = warm_up()
+
+        self.assertGreaterEqual(compiled, 30)
+        self.assertIn(f'Compiled {compiled} templates', logs.output[0])
+
+
+    @override_settings(TEMPLATE_WARMUP=False)
+    def test_warm_up_disabled(self):
+        self.assertEqual(warm_up(), 0)
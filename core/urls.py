@@ -0,0 +1,9 @@
+from django.urls import path
+
+from core import views
+
+
+urlpatterns = [
+    path('metrics/', views.request_metrics_view, name='request_metrics'),
+    path('sw.js', views.service_worker_view, name='service_worker'),
+]
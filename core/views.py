@@ -1,3 +1,35 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.views.decorators.http import require_GET
+
+from core.middleware import request_metrics
+
+
+@staff_member_required
+def request_metrics_view(request):
+    """
+    Returns this worker's per URL name request metrics as JSON. POST resets 
+    them.
+    """
+
+    if request.method == 'POST':
+        request_metrics.reset()
+
+    return JsonResponse(request_metrics.snapshot())
+
+
+@require_GET
+def service_worker_view(request):
+    """
+    Serves the service worker, allowed to control the whole site although 
+    it isn't served from the root. Revalidated on every update check, so 
+    changes to it are picked up promptly.
+    """
+
+    response = render(request, 'core/service-worker.js', content_type='application/javascript')
+    response['Service-Worker-Allowed'] = '/'
+    response['Cache-Control'] = 'no-cache'
+
+    return response
 
-# Create your views here.
@@ -0,0 +1,72 @@
+import logging, os, time
+
+from django.conf import settings
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+
+from habits.services import release_digest
+
+
+logger = logging.getLogger(__name__)
+
+# Files under the template directories that are compiled as templates.
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.js')
+
+
+def project_template_dirs(engine) -> list:
+    """
+    Returns the engine's template directories and the app template 
+    directories inside the project, leaving out those of third party apps, 
+    whose templates are mostly unused.
+    """
+
+    base_dir = str(settings.BASE_DIR)
+    return [
+        str(directory) for directory in [*engine.dirs, *get_app_template_dirs('templates')]
+        if os.path.commonpath([base_dir, str(directory)]) == base_dir
+    ]
+
+
+def warm_up() -> int:
+    """
+    Compiles every project template into the cached template loader, loads 
+    the URLconf with the views it imports, and computes the release digest, 
+    so a new worker's first requests don't pay for them. Called from the WSGI 
+    and ASGI entry points when TEMPLATE_WARMUP is set. Returns the number of 
+    templates compiled.
+    """
+
+    if not settings.TEMPLATE_WARMUP:
+        return 0
+
+    start = time.perf_counter()
+    compiled = 0
+
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+
+        for directory in project_template_dirs(engine.engine):
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if not name.endswith(TEMPLATE_EXTENSIONS):
+                        continue
+
+                    template_name = os.path.relpath(os.path.join(root, name), directory)
+                    try:
+                        engine.get_template(template_name)
+                        compiled += 1
+                    except TemplateSyntaxError:
+                        logger.exception('Could not compile template %s', template_name)
+
+    # Reading the reverse lookup table imports the URLconf and builds it.
+    get_resolver().reverse_dict
+    release_digest()
+
+    logger.info(
+        'Compiled %d templates in %.1f ms', compiled, (time.perf_counter() - start) * 1000,
+    )
+
+    return compiled
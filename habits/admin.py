@@ -1,7 +1,8 @@
 from django.contrib import admin
 
-from habits.models import Habit, CompletedDay
+from habits.models import Habit, ArchivedHabit, CompletedDay
 
 
 admin.site.register(Habit)
 admin.site.register(CompletedDay)
+admin.site.register(ArchivedHabit)
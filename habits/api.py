@@ -0,0 +1,184 @@
+import base64, hashlib, uuid
+from datetime import datetime, time, timezone as dt_timezone
+from functools import wraps
+
+from django.http import Http404, JsonResponse, HttpResponseNotAllowed
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from habits.grid import current_day, mask_to_bytes
+from habits.models import Habit
+from habits.services import get_active_habits, toggle_habit_day
+
+
+# Fields the API responses are built from. A change to any of them, or to
+# the day, changes the ETag.
+VERSION_FIELDS = (
+    'id',
+    'name',
+    'duration',
+    'created_at',
+    'updated_at',
+    'complete',
+    'completion_bits',
+    *Habit.STATS_FIELDS,
+)
+
+
+def api_login_required(view):
+    """
+    Like login_required, but answers anonymous requests with a 401 JSON error
+    rather than a redirect to the login page.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required.'}, status=401)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def habits_etag(habits, today) -> str:
+    """
+    Returns a strong ETag over everything the habits' representations are
+    built from, including today, which the streaks depend on.
+    """
+
+    digest = hashlib.md5(today.isoformat().encode(), usedforsecurity=False)
+    for habit in habits:
+        for field in VERSION_FIELDS:
+            digest.update(repr(getattr(habit, field)).encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def serialize_habit(habit, bitmap=False) -> dict:
+    data = {
+        'id': str(habit.pk),
+        'name': habit.name,
+        'duration': habit.duration,
+        'start_date': habit.created_at.date().isoformat(),
+        'created_at': habit.created_at.isoformat(),
+        'updated_at': habit.updated_at.isoformat(),
+        'complete': habit.complete,
+        'completed_count': habit.completed_count,
+        'current_streak': habit.streak,
+        'longest_streak': habit.longest_streak,
+        'last_completed_day': habit.last_completed_day and habit.last_completed_day.isoformat(),
+    }
+
+    if bitmap:
+        # Bit n, least significant first within each byte, is start_date + n.
+        data['completion_bitmap'] = base64.b64encode(
+            mask_to_bytes(habit.completion_mask, habit.duration)
+        ).decode()
+
+    return data
+
+
+def get_user_habit(request, pk, queryset=Habit.objects):
+    """
+    Returns the user's active habit with the given primary key, or None.
+    """
+
+    try:
+        pk = uuid.UUID(str(pk))
+    except ValueError:
+        return None
+
+    return queryset.filter(pk=pk, owner=request.user, deleted=False).first()
+
+
+def not_found():
+    return JsonResponse({'error': 'Not found.'}, status=404)
+
+
+def last_modified(habit, today) -> int:
+    """
+    Returns when a habit's representation last changed, as a timestamp: its
+    last update, or the start of today if later, as streaks lapse by day.
+    """
+
+    start_of_today = datetime.combine(today, time.min, tzinfo=dt_timezone.utc)
+    return int(max(habit.updated_at, start_of_today).timestamp())
+
+
+def conditional_json(request, data, habits, today, modified=None):
+    """
+    Returns a 304 if the client's ETag, or failing that its 
+    If-Modified-Since, shows it has the current version, otherwise the data 
+    as JSON. Responses are private, and revalidated on every use.
+    """
+
+    etag = habits_etag(habits, today)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=modified,
+    ) or JsonResponse(data)
+    response['ETag'] = etag
+    if modified is not None:
+        response['Last-Modified'] = http_date(modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@api_login_required
+def habits_api_view(request):
+    """
+    Lists the user's active habits and their statistics.
+    """
+
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    today = current_day()
+    habits = get_active_habits(request.user)
+    data = {
+        'today': today.isoformat(),
+        'habits': [serialize_habit(habit) for habit in habits],
+    }
+
+    return conditional_json(request, data, habits, today)
+
+
+@api_login_required
+def habit_api_view(request, pk):
+    """
+    Returns a habit with its completion bitmap.
+    """
+
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    today = current_day()
+    habit = get_user_habit(request, pk)
+    if habit is None:
+        return not_found()
+
+    data = {'today': today.isoformat(), 'habit': serialize_habit(habit, bitmap=True)}
+
+    return conditional_json(request, data, [habit], today, last_modified(habit, today))
+
+
+@api_login_required
+def habit_toggle_api_view(request, pk):
+    """
+    Toggles today's completion of a habit, and returns the updated habit.
+    """
+
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    today = current_day()
+
+    try:
+        habit, _ = toggle_habit_day(request.user, pk, today, fields=VERSION_FIELDS)
+    except Http404:
+        return not_found()
+
+    data = {'today': today.isoformat(), 'habit': serialize_habit(habit, bitmap=True)}
+
+    response = JsonResponse(data)
+    response['ETag'] = habits_etag([habit], today)
+    response['Last-Modified'] = http_date(last_modified(habit, today))
+    return response
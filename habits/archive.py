@@ -0,0 +1,76 @@
+from django.db import connection, transaction
+from django.db.models import Q
+
+from habits.models import Habit, ArchivedHabit, CompletedDay, SyncedOperation
+
+
+DELETE_COMPLETED_DAYS_SQL = """
+    DELETE FROM {completed_day_table} WHERE habit_id = ANY(%(habit_ids)s::uuid[])
+"""
+
+
+def archive_deleted_habits(before, batch_size=500) -> int:
+    """
+    Moves up to batch_size habits soft deleted before the given time into 
+    ArchivedHabit, then deletes them and their completed days, in one short 
+    transaction. Habits deleted before deleted_at was recorded are judged by 
+    their last update. Habits locked elsewhere are skipped, for a later 
+    batch. Returns the number archived.
+    """
+
+    with transaction.atomic():
+        habits = list(
+            Habit.objects.select_for_update(skip_locked=True).filter(
+                Q(deleted_at__lt=before) | Q(deleted_at__isnull=True, updated_at__lt=before),
+                deleted=True,
+            ).only(
+                'id', 'owner_id', 'name', 'duration', 'created_at', 'updated_at', 
+                'deleted_at', 'completion_bits', 'completed_count', 'longest_streak',
+            ).order_by('deleted_at')[:batch_size]
+        )
+        if not habits:
+            return 0
+
+        ArchivedHabit.objects.bulk_create(
+            [
+                ArchivedHabit(
+                    id=habit.pk,
+                    owner_id=habit.owner_id,
+                    name=habit.name,
+                    duration=habit.duration,
+                    created_at=habit.created_at,
+                    deleted_at=habit.deleted_at or habit.updated_at,
+                    completion_bits=habit.completion_bits,
+                    completed_count=habit.completed_count,
+                    longest_streak=habit.longest_streak,
+                )
+                for habit in habits
+            ],
+            ignore_conflicts=True,
+        )
+
+        habit_ids = [habit.pk for habit in habits]
+
+        # Raw, so the delete signals don't load and rebuild each completed day.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                DELETE_COMPLETED_DAYS_SQL.format(
+                    completed_day_table=CompletedDay._meta.db_table,
+                ),
+                {'habit_ids': habit_ids},
+            )
+
+        Habit.objects.filter(pk__in=habit_ids).delete()
+
+    return len(habits)
+
+
+def prune_synced_operations(before, batch_size=5000) -> int:
+    """
+    Deletes up to batch_size sync keys recorded before the given time, by 
+    which point no client will replay them. Returns the number deleted.
+    """
+
+    keys = SyncedOperation.objects.filter(created_at__lt=before).values('pk')[:batch_size]
+    deleted, _ = SyncedOperation.objects.filter(pk__in=keys).delete()
+    return deleted
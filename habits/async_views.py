@@ -0,0 +1,106 @@
+import itertools
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseNotAllowed, Http404
+from django.shortcuts import redirect
+from django.urls import reverse
+
+from habits.grid import current_day
+from habits.services import aget_active_habits, find_habit, toggle_habit_day
+from habits.views import export_response, render_habit_page, render_toggle
+
+
+# Async versions of the busiest habit views, routed in place of the sync
+# ones when HABITS_ASYNC_VIEWS is set, for serving under ASGI. They make
+# the same queries with the async ORM, so a request waiting on the database
+# doesn't hold a worker thread. Rendering never queries, so it stays on the
+# event loop.
+
+
+async def _auser(request):
+    """
+    Loads the user without blocking, and sets it as request.user, so the
+    templates and context processors reading it don't query synchronously.
+    """
+
+    request.user = await request.auser()
+    return request.user
+
+
+# Export lines read per trip to the sync thread.
+EXPORT_CHUNK_LINES = 500
+
+
+async def _aiter_chunks(lines, size=EXPORT_CHUNK_LINES):
+    """
+    Iterates a sync iterator asynchronously, a chunk at a time, in the 
+    request's sync thread, so the database cursor behind it stays on the 
+    connection that opened it.
+    """
+
+    while chunk := await sync_to_async(lambda: list(itertools.islice(lines, size)))():
+        for line in chunk:
+            yield line
+
+
+@login_required
+async def home_view(request):
+    """
+    Async version of views.home_view.
+    """
+
+    user_habits = await aget_active_habits(await _auser(request))
+
+    if user_habits:
+        habit = max(user_habits, key=lambda habit: habit.updated_at)
+
+        return render_habit_page(request, habit, user_habits)
+
+    else:
+        return redirect(reverse('create_habit'))
+
+
+@login_required
+async def habit_view(request, pk):
+    """
+    Async version of views.habit_view.
+    """
+
+    user_habits = await aget_active_habits(await _auser(request))
+    habit = find_habit(user_habits, pk)
+
+    if habit is None:
+        raise Http404
+
+    return render_habit_page(request, habit, user_habits)
+
+
+@login_required
+async def toggle_completed_day_view(request, pk):
+    """
+    Async version of views.toggle_completed_day_view. The locked toggle needs
+    a transaction, which the async ORM doesn't support, so it runs in a
+    thread.
+    """
+
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    user = await _auser(request)
+    today = current_day()
+
+    habit, completed = await sync_to_async(toggle_habit_day)(user, pk, today)
+
+    return render_toggle(request, habit, today, completed)
+
+
+@login_required
+async def export_view(request):
+    """
+    Async version of views.export_view. The export is read by the sync ORM, 
+    so chunks of its lines are pulled from a thread, and the response 
+    streams in constant memory under ASGI.
+    """
+
+    return export_response(request, await _auser(request), stream=_aiter_chunks)
@@ -0,0 +1,4 @@
+# Cache holding rendered grid fragments. Fragments are keyed by the habit's
+# updated_at, which every change to the habit moves, so they never need to
+# be invalidated.
+GRID_CACHE = 'grids'
@@ -0,0 +1,70 @@
+import csv, json
+
+
+EXPORT_FIELDS = (
+    'owner',
+    'habit_id',
+    'habit',
+    'duration',
+    'created_at',
+    'complete',
+    'deleted',
+    'day',
+)
+
+
+class Echo:
+    """
+    File-like object that returns what is written to it, so csv.writer can
+    produce lines for a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_rows(habits, chunk_size=2000):
+    """
+    Streams one row per completed day of each habit, and a row with no day
+    for habits without any, through a server-side cursor.
+    """
+
+    return habits.order_by(
+        'owner__email', 'created_at', 'id', 'completed_days__day',
+    ).values_list(
+        'owner__email',
+        'id',
+        'name',
+        'duration',
+        'created_at',
+        'complete',
+        'deleted',
+        'completed_days__day',
+    ).iterator(chunk_size=chunk_size)
+
+
+def _serialize(row) -> list:
+    return [
+        value.isoformat() if hasattr(value, 'isoformat')
+        else str(value) if field == 'habit_id'
+        else value
+        for field, value in zip(EXPORT_FIELDS, row)
+    ]
+
+
+def csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(_serialize(row))
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, _serialize(row)))) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (csv_lines, 'text/csv'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+}
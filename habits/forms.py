@@ -1,5 +1,7 @@
 from django import forms
+from django.core.exceptions import ValidationError
 
+from habits.imports import detect_format
 from habits.models import Habit
 
 
@@ -27,4 +29,30 @@ class CreateHabitForm(forms.ModelForm):
 
         self.fields['duration'].required = True
         self.fields['duration'].choices = Habit.DURATION_CHOICES
-        self.initial['duration'] = 60
\ No newline at end of file
+        self.initial['duration'] = 60
+
+
+class ImportHistoryForm(forms.Form):
+
+    # Largest upload accepted, in bytes.
+    MAX_SIZE = 5 * 1024 * 1024
+
+    file = forms.FileField(
+        label='File',
+        widget=forms.ClearableFileInput(
+            attrs={
+                'accept': '.csv,.json,.ndjson',
+            }
+        ),
+    )
+
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+
+        if file.size > self.MAX_SIZE:
+            raise ValidationError('Files can be at most 5 MB.')
+
+        self.import_format = detect_format(file.name)
+
+        return file
@@ -0,0 +1,135 @@
+from datetime import date
+
+from django.utils import timezone
+
+
+def current_day() -> date:
+    """
+    Returns the date used as 'today' across the habit grids and toggles.
+    """
+
+    return timezone.now().date()
+
+
+def mask_from_days(start_date: date, days) -> int:
+    """
+    Packs an iterable of dates into an integer bitmask, where bit n is set if
+    the day n days after start_date is present. Days before start_date are
+    ignored.
+    """
+
+    start = start_date.toordinal()
+    mask = 0
+
+    for day in days:
+        offset = day.toordinal() - start
+        if offset >= 0:
+            mask |= 1 << offset
+
+    return mask
+
+
+def days_from_mask(start_date: date, mask: int):
+    """
+    Yields the dates of the set bits in mask, in day order.
+    """
+
+    start = start_date.toordinal()
+    offset = 0
+
+    while mask:
+        if mask & 1:
+            yield date.fromordinal(start + offset)
+        mask >>= 1
+        offset += 1
+
+
+def mask_from_bytes(bits) -> int:
+    return int.from_bytes(bits or b'', 'little')
+
+
+def mask_to_bytes(mask: int, duration: int) -> bytes:
+    """
+    Serializes mask little-endian, padded to cover every day of the duration.
+    """
+
+    length = max((duration + 7) // 8, (mask.bit_length() + 7) // 8)
+    return mask.to_bytes(length, 'little')
+
+
+def completion_stats(mask: int) -> dict:
+    """
+    Returns the completed count, longest streak, and the streak ending on the 
+    last completed day, as day offsets into the mask.
+    """
+
+    if not mask:
+        return {
+            'completed_count': 0,
+            'current_streak': 0,
+            'longest_streak': 0,
+            'last_completed_offset': None,
+        }
+
+    last = mask.bit_length() - 1
+    gaps = ~mask & ((1 << last) - 1)
+    current_streak = last - gaps.bit_length() + 1
+
+    # Each pass shortens every run of set bits by one.
+    longest_streak = 0
+    runs = mask
+    while runs:
+        runs &= runs << 1
+        longest_streak += 1
+
+    return {
+        'completed_count': mask.bit_count(),
+        'current_streak': current_streak,
+        'longest_streak': longest_streak,
+        'last_completed_offset': last,
+    }
+
+
+class HabitGrid:
+    """
+    Day grid for a habit, built lazily from a bitmask of completed days.
+
+    Cells are only generated when the grid is iterated, so a grid that is
+    never rendered (e.g. a cached template fragment) costs nothing.
+    """
+
+    __slots__ = ('start_date', 'duration', 'mask', 'today')
+
+    def __init__(self, start_date: date, duration: int, mask: int = 0, today: date = None):
+        self.start_date = start_date
+        self.duration = duration
+        self.mask = mask
+        self.today = today or current_day()
+
+
+    def __len__(self):
+        return self.duration
+
+
+    def __iter__(self):
+        for _, cell in self.items():
+            yield cell
+
+
+    def items(self):
+        """
+        Yields (date, cell) pairs in day order, one pass over the duration.
+        """
+
+        start = self.start_date.toordinal()
+        today_offset = self.today.toordinal() - start
+        mask = self.mask
+
+        for offset in range(self.duration):
+            day = date.fromordinal(start + offset)
+            yield day, {
+                'date': day.isoformat(),
+                'completed': bool(mask >> offset & 1),
+                'is_past': offset < today_offset,
+                'is_today': offset == today_offset,
+            }
@@ -0,0 +1,155 @@
+import csv, itertools, json, uuid
+from datetime import date, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from habits.grid import current_day
+from habits.models import Habit, CompletedDay
+
+
+IMPORT_FORMATS = ('csv', 'json')
+
+# Errors reported back before giving up on a file.
+MAX_ERRORS = 20
+
+
+def detect_format(filename) -> str:
+    """
+    Returns the import format for a filename, from its extension.
+    """
+
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension == 'csv':
+        return 'csv'
+    if extension in ('json', 'ndjson'):
+        return 'json'
+    raise ValidationError('Upload a .csv, .json or .ndjson file.')
+
+
+def parse_records(lines, import_format):
+    """
+    Yields (line number, record) pairs from an iterable of text lines. CSV
+    needs a header row; JSON can be an array of objects or one object per
+    line, as written by the export.
+    """
+
+    if import_format == 'csv':
+        for number, record in enumerate(csv.DictReader(lines), start=2):
+            yield number, record
+        return
+
+    lines = iter(lines)
+    first_line = next(lines, '')
+
+    if first_line.lstrip().startswith('['):
+        records = json.loads(first_line + ''.join(lines))
+        for number, record in enumerate(records, start=1):
+            yield number, record
+        return
+
+    for number, line in enumerate(itertools.chain([first_line], lines), start=1):
+        if line.strip():
+            yield number, json.loads(line)
+
+
+def _find_habit(record, habits_by_id, habits_by_name):
+    habit_id = record.get('habit_id')
+    if habit_id:
+        try:
+            return habits_by_id.get(uuid.UUID(str(habit_id)))
+        except ValueError:
+            return None
+
+    matches = habits_by_name.get(record.get('habit'), [])
+    return matches[0] if len(matches) == 1 else None
+
+
+def import_completed_days(user, records, batch_size=1000) -> dict:
+    """
+    Validates and imports completed days for the user's active habits. Each
+    record names its habit by 'habit_id' or a unique 'habit' name, and gives
+    the 'day' as YYYY-MM-DD. Records without a day are skipped.
+
+    Every record is checked before anything is written, and the file is
+    rejected with a ValidationError listing the problems if any are invalid.
+    Otherwise the deduplicated days are written in batches, ignoring days
+    already recorded, and the habits' completion bits and statistics are
+    rebuilt, all in one transaction with the habits locked.
+
+    Returns the number of days newly recorded, the days in the file that 
+    were already recorded, and the habits the file covers.
+    """
+
+    habits = list(Habit.objects.filter(owner=user, deleted=False))
+    habits_by_id = {habit.pk: habit for habit in habits}
+    habits_by_name = {}
+    for habit in habits:
+        habits_by_name.setdefault(habit.name, []).append(habit)
+
+    today = current_day()
+    days = set()
+    errors = []
+
+    try:
+        for number, record in records:
+            if len(errors) >= MAX_ERRORS:
+                break
+
+            if not isinstance(record, dict):
+                errors.append(f'Row {number}: expected an object.')
+                continue
+
+            if not record.get('day'):
+                continue
+
+            habit = _find_habit(record, habits_by_id, habits_by_name)
+            if habit is None:
+                errors.append(f'Row {number}: habit not found.')
+                continue
+
+            try:
+                day = date.fromisoformat(str(record['day']))
+            except ValueError:
+                errors.append(f"Row {number}: '{record['day']}' is not a valid date.")
+                continue
+
+            start = habit.created_at.date()
+            end = min(start + timedelta(days=habit.duration - 1), today)
+            if not start <= day <= end:
+                errors.append(
+                    f'Row {number}: {day} is outside {habit.name} ({start} to {end}).'
+                )
+                continue
+
+            days.add((habit.pk, day))
+
+    except (csv.Error, json.JSONDecodeError, UnicodeDecodeError) as e:
+        errors.append(f'The file could not be read: {e}')
+
+    if errors:
+        raise ValidationError(errors)
+
+    habit_ids = {habit_id for habit_id, _ in days}
+
+    with transaction.atomic():
+        # Locked first, as for a toggle, so the count below and the rebuilt 
+        # bits can't miss a concurrent change to the same habits.
+        list(
+            Habit.objects.select_for_update(no_key=True).filter(
+                pk__in=habit_ids, owner=user,
+            ).order_by('pk').values_list('pk', flat=True)
+        )
+        recorded = CompletedDay.objects.filter(habit__in=habit_ids).count()
+        rebuilt = CompletedDay.objects.set_completed(
+            [(habits_by_id[habit_id], day, True) for habit_id, day in sorted(days)],
+            batch_size=batch_size,
+        )
+        # Days already recorded are skipped silently, so count what was added.
+        imported = sum(habit.completed_count for habit in rebuilt) - recorded
+
+    return {
+        'days': imported, 
+        'already_recorded': len(days) - imported, 
+        'habits': len(habit_ids),
+    }
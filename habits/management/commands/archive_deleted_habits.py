@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from habits.archive import archive_deleted_habits, prune_synced_operations
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves habits soft deleted for longer than the retention period into "
+        "the archive, with their completed days, and deletes old sync keys. "
+        "Works in batches, each in its own short transaction."
+    )
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.HABITS_ARCHIVE_AFTER_DAYS,
+            help="Days a habit stays soft deleted before it is archived.",
+        )
+        parser.add_argument(
+            "--sync-days",
+            type=int,
+            default=settings.SYNCED_OPERATION_RETENTION_DAYS,
+            help="Days a synced operation's key is kept for.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Habits archived per batch.",
+        )
+
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+
+        archived = 0
+        while batch := archive_deleted_habits(
+            now - timedelta(days=options['days']), 
+            options['batch_size'],
+        ):
+            archived += batch
+
+        pruned = 0
+        while batch := prune_synced_operations(now - timedelta(days=options['sync_days'])):
+            pruned += batch
+
+        self.stdout.write(f'Archived {archived} habits and deleted {pruned} sync keys.')
@@ -0,0 +1,259 @@
+import json, platform, random, statistics, time, tracemalloc
+from datetime import timedelta
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.template.loader import render_to_string
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from habits.cache import GRID_CACHE
+from habits.grid import days_from_mask, mask_to_bytes
+from habits.models import Habit, CompletedDay
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the habit views and grid generation across habit durations "
+        "and habits per user. Runs inside a transaction that is rolled back."
+    )
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeats",
+            type=int,
+            default=50,
+            help="Timed runs per case.",
+        )
+        parser.add_argument(
+            "--durations",
+            type=int,
+            nargs="+",
+            default=[value for value, _ in Habit.DURATION_CHOICES],
+            help="Habit durations to benchmark.",
+        )
+        parser.add_argument(
+            "--habits",
+            type=int,
+            nargs="+",
+            help="Habits per user to benchmark, defaults to 1 up to the habit limit.",
+        )
+        parser.add_argument(
+            "--density",
+            type=float,
+            default=0.6,
+            help="Fraction of elapsed days completed.",
+        )
+        parser.add_argument(
+            "--cold-cache",
+            action="store_true",
+            help="Clear the grid cache before every request.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write results as JSON to this file.",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Previous JSON results to compare p50 latency against.",
+        )
+
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        self.options = options
+
+        habit_limit = get_user_model()._meta.get_field('habit_limit').default
+        habit_counts = options['habits'] or sorted({1, (habit_limit + 1) // 2, habit_limit})
+
+        results = []
+        try:
+            with transaction.atomic():
+                for duration in options['durations']:
+                    for habit_count in habit_counts:
+                        results += self.benchmark(duration, habit_count)
+                raise Rollback
+        except Rollback:
+            pass
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'repeats': options['repeats'],
+            'cold_cache': options['cold_cache'],
+            'results': results,
+        }
+
+        self.print_results(results)
+
+        if options['compare']:
+            self.print_comparison(results, options['compare'])
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+
+    def create_user_habits(self, duration, habit_count) -> list:
+        """
+        Creates a user with habit_count habits of the given duration, each
+        half way through with a random completion history.
+        """
+
+        now = timezone.now()
+        user = get_user_model().objects.create(
+            email=f'benchmark-{duration}-{habit_count}@example.com',
+        )
+
+        habits = []
+        for i in range(habit_count):
+            created_at = now - timedelta(days=duration // 2)
+            mask = 0
+            for offset in range(duration // 2):
+                if random.random() < self.options['density']:
+                    mask |= 1 << offset
+
+            habit = Habit(
+                owner=user,
+                name=f'Habit {i + 1}',
+                duration=duration,
+                created_at=created_at,
+                completion_bits=mask_to_bytes(mask, duration),
+            )
+            # Bulk created, so no signal fills in the statistics.
+            habit.refresh_stats()
+            habits.append(habit)
+
+        habits = Habit.objects.bulk_create(habits)
+        CompletedDay.objects.bulk_create(
+            CompletedDay(habit=habit, day=day)
+            for habit in habits
+            for day in days_from_mask(habit.created_at.date(), habit.completion_mask)
+        )
+
+        return habits
+
+
+    def benchmark(self, duration, habit_count) -> list:
+        habits = self.create_user_habits(duration, habit_count)
+        habit = habits[0]
+
+        today = timezone.now().date().isoformat()
+
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(habit.owner)
+
+        cases = {
+            'home_view': lambda: client.get(reverse('home')),
+            'habit_view': lambda: client.get(reverse('habit', kwargs={'pk': habit.pk})),
+            'toggle_completed_day_view': lambda: client.post(
+                reverse('habit_completed_day_toggle', kwargs={'pk': habit.pk})
+            ),
+            'set_completed_days_view': lambda: client.post(
+                reverse('habit_completed_days_set'), 
+                {
+                    'habit_id': [user_habit.pk for user_habit in habits],
+                    'day': [today] * len(habits),
+                    'state': ['1'] * len(habits),
+                },
+            ),
+            'generate_grid': habit.generate_grid,
+            'render_grid': lambda: render_to_string('habits/partials/grid.html', {
+                'habit': habit, 
+                'date_grid': habit.grid(),
+            }),
+        }
+
+        return [
+            {
+                'case': name,
+                'duration': duration,
+                'habits': habit_count,
+                **self.measure(func),
+            }
+            for name, func in cases.items()
+        ]
+
+
+    def measure(self, func) -> dict:
+        """
+        Times func over the configured repeats, then counts its queries and
+        allocations on one further call.
+        """
+
+        def call():
+            if self.options['cold_cache']:
+                caches[GRID_CACHE].clear()
+            return func()
+
+        call()
+
+        timings = []
+        for _ in range(self.options['repeats']):
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        # Read now, as the next request resets the connection's query log.
+        query_count = len(queries)
+
+        tracemalloc.start()
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+
+        return {
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'p50_ms': round(percentiles[49], 3),
+            'p95_ms': round(percentiles[94], 3),
+            'p99_ms': round(percentiles[98], 3),
+            'queries': query_count,
+            'peak_alloc_kib': round(peak / 1024, 1),
+        }
+
+
+    def print_results(self, results):
+        self.stdout.write(
+            f"{'case':<26} {'days':>5} {'habits':>6} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'queries':>7} {'peak KiB':>9}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result['case']:<26} {result['duration']:>5} {result['habits']:>6} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                f"{result['queries']:>7} {result['peak_alloc_kib']:>9.1f}"
+            )
+
+
+    def print_comparison(self, results, path):
+        with open(path) as f:
+            previous = {
+                (result['case'], result['duration'], result['habits']): result
+                for result in json.load(f)['results']
+            }
+
+        self.stdout.write(f"\nChange in p50 against {path}:")
+        for result in results:
+            before = previous.get((result['case'], result['duration'], result['habits']))
+            if before and before['p50_ms']:
+                change = (result['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+                self.stdout.write(
+                    f"{result['case']:<26} {result['duration']:>5} {result['habits']:>6} "
+                    f"{change:>+8.1f}%"
+                )
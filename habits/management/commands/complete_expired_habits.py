@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from habits.grid import current_day
+from habits.models import Habit
+from habits.services import store_final_grids
+
+
+class Command(BaseCommand):
+    help = (
+        "Marks habits past their last day as completed, freezing their "
+        "statistics, and stores their final grids. Run daily, after midnight "
+        "UTC."
+    )
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Habits completed per batch.",
+        )
+
+
+    def handle(self, *args, **options):
+        today = current_day()
+        completed = 0
+
+        while habits := Habit.objects.complete_expired(today, options['batch_size']):
+            store_final_grids(habits)
+            completed += len(habits)
+
+        self.stdout.write(f'Completed {completed} expired habits.')
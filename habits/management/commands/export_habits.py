@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+
+from habits.export import EXPORT_FORMATS, export_rows
+from habits.models import Habit
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams habits and their completed days as CSV or NDJSON, for all "
+        "users or the given users, using a server-side cursor."
+    )
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "emails",
+            nargs="*",
+            help="Emails of the users to export, defaults to all users.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(EXPORT_FORMATS),
+            default="csv",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write to, defaults to stdout.",
+        )
+        parser.add_argument(
+            "--include-deleted",
+            action="store_true",
+            help="Include soft deleted habits.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Rows fetched from the database at a time.",
+        )
+
+
+    def handle(self, *emails, **options):
+        habits = Habit.objects.all()
+        if emails:
+            habits = habits.filter(owner__email__in=emails)
+        if not options['include_deleted']:
+            habits = habits.filter(deleted=False)
+
+        lines, _ = EXPORT_FORMATS[options['format']]
+        rows = export_rows(habits, chunk_size=options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as f:
+                f.writelines(lines(rows))
+        else:
+            for line in lines(rows):
+                self.stdout.write(line, ending='')
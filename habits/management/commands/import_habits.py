@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from habits.imports import IMPORT_FORMATS, detect_format, import_completed_days, parse_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports completed days for a user's habits from a CSV or JSON file, "
+        "validating every row before writing in batches."
+    )
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "email",
+            help="Email of the user to import for.",
+        )
+        parser.add_argument(
+            "path",
+            help="CSV, JSON or NDJSON file to import.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="File format, defaults to detecting it from the extension.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows inserted per query.",
+        )
+
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(email=options['email'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email '{options['email']}'")
+
+        try:
+            import_format = options['format'] or detect_format(options['path'])
+
+            with open(options['path'], newline='', encoding='utf-8-sig') as f:
+                result = import_completed_days(
+                    user,
+                    parse_records(f, import_format),
+                    batch_size=options['batch_size'],
+                )
+        except ValidationError as e:
+            raise CommandError('\n'.join(e.messages))
+
+        self.stdout.write(
+            f"Imported {result['days']} days across {result['habits']} habits "
+            f"({result['already_recorded']} already recorded)"
+        )
@@ -0,0 +1,31 @@
+import itertools
+
+from django.core.management.base import BaseCommand
+
+from habits.models import Habit
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds every habit's completion bits and statistics from its "
+        "CompletedDay rows, repairing any drift."
+    )
+
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Habits rebuilt per batch.",
+        )
+
+
+    def handle(self, *args, **options):
+        habit_ids = Habit.objects.order_by('pk').values_list('pk', flat=True).iterator()
+        rebuilt = 0
+
+        while batch := list(itertools.islice(habit_ids, options['batch_size'])):
+            rebuilt += len(Habit.objects.rebuild_completions(batch))
+
+        self.stdout.write(f'Recomputed statistics for {rebuilt} habits.')
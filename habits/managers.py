@@ -0,0 +1,245 @@
+import uuid
+from collections import defaultdict
+
+from django.db import models, connections, transaction
+from django.utils import timezone
+
+from habits.grid import mask_from_days, mask_to_bytes
+
+
+class HabitManager(models.Manager):
+
+    def create_for_owner(self, habit) -> bool:
+        """
+        Saves a new habit if its owner is below their habit limit, returning 
+        False if not. The owner row is locked while checking, so concurrent 
+        creates can't exceed the limit.
+        """
+
+        user_model = self.model._meta.get_field('owner').related_model
+
+        with transaction.atomic(using=self.db):
+            owner = user_model.objects.select_for_update().only(
+                'id', 'habit_limit', 'active_habit_count').get(pk=habit.owner_id)
+
+            if owner.max_habits_created():
+                return False
+
+            habit.save(using=self.db)
+
+        return True
+
+
+    def rebuild_completions(self, habit_ids) -> list:
+        """
+        Recomputes the completion bits and statistics of the given habits 
+        from their CompletedDay rows, marking them updated, and returns the 
+        updated habits.
+        """
+
+        habits = list(
+            self.filter(pk__in=habit_ids).only('id', 'created_at', 'duration', 'complete')
+        )
+        if not habits:
+            return habits
+
+        completed_day_model = self.model._meta.get_field('completed_days').related_model
+        days = defaultdict(list)
+        for habit_id, day in completed_day_model.objects.filter(
+            habit__in=habits).values_list('habit_id', 'day'):
+            days[habit_id].append(day)
+
+        updated_at = timezone.now()
+        for habit in habits:
+            mask = mask_from_days(habit.created_at.date(), days[habit.pk])
+            habit.completion_bits = mask_to_bytes(mask, habit.duration)
+            habit.refresh_stats()
+            habit.updated_at = updated_at
+
+        self.bulk_update(habits, ['completion_bits', 'updated_at', *self.model.STATS_FIELDS])
+
+        return habits
+
+
+    def complete_expired(self, today, batch_size=500) -> list:
+        """
+        Marks up to batch_size habits whose last day is before today as 
+        completed, freezing their statistics, in one transaction. Habits 
+        locked by a toggle are left for a later batch. Returns the completed 
+        habits.
+        """
+
+        with transaction.atomic(using=self.db):
+            habits = list(
+                self.select_for_update(skip_locked=True).filter(
+                    complete=False, 
+                    deleted=False, 
+                    ends_on__lt=today,
+                ).only('id', 'created_at', 'duration', 'completion_bits')[:batch_size]
+            )
+
+            completed_at = timezone.now()
+            for habit in habits:
+                habit.complete = True
+                habit.completed_at = completed_at
+                habit.updated_at = completed_at
+                habit.refresh_stats()
+
+            self.bulk_update(
+                habits, 
+                ['complete', 'completed_at', 'updated_at', *self.model.STATS_FIELDS],
+            )
+
+        return habits
+
+
+class CompletedDayManager(models.Manager):
+
+    TOGGLE_SQL = """
+        WITH removed AS (
+            DELETE FROM {completed_day_table}
+            WHERE habit_id = %(habit_id)s AND day = %(day)s
+            RETURNING id
+        ),
+        inserted AS (
+            INSERT INTO {completed_day_table} (id, habit_id, day)
+            SELECT %(id)s, %(habit_id)s, %(day)s
+            WHERE NOT EXISTS (SELECT 1 FROM removed)
+            ON CONFLICT (habit_id, day) DO NOTHING
+            RETURNING id
+        ),
+        updated AS (
+            UPDATE {habit_table}
+            SET completion_bits = set_bit(
+                completion_bits || decode(
+                    repeat('00', greatest(0, %(length)s - length(completion_bits))), 
+                    'hex'
+                ),
+                %(offset)s,
+                CASE WHEN EXISTS (SELECT 1 FROM removed) THEN 0 ELSE 1 END
+            ),
+            updated_at = %(updated_at)s,
+            {stats}
+            WHERE id = %(habit_id)s
+            RETURNING completion_bits
+        )
+        SELECT NOT EXISTS (SELECT 1 FROM removed), (SELECT completion_bits FROM updated)
+    """
+
+    DELETE_DAYS_SQL = """
+        DELETE FROM {completed_day_table} AS completed_day
+        USING unnest(%(habit_ids)s::uuid[], %(days)s::date[]) AS removed (habit_id, day)
+        WHERE completed_day.habit_id = removed.habit_id AND completed_day.day = removed.day
+    """
+
+
+    # Sets a statistic to its value for whichever way the day was toggled.
+    TOGGLE_STATS_SQL = """
+        {field} = CASE WHEN EXISTS (SELECT 1 FROM removed) 
+            THEN %(removed_{field})s::{db_type} ELSE %(added_{field})s::{db_type} END
+    """
+
+
+    def toggle(self, habit, day) -> bool:
+        """
+        Toggles the completed day for habit in a single statement, deleting 
+        the row if it exists or inserting it if it doesn't, flipping the
+        matching completion bit, and saving the habit's statistics and 
+        updated time. The statistics for either outcome are computed up front 
+        from the habit's loaded completion bits, and the statement picks the 
+        one matching what it did. Returns True if the day is now completed.
+
+        Callers should lock the habit row and load its completion bits first 
+        (see toggle_habit_day), so the bits can't change underneath, and as 
+        the statement's row locks are otherwise taken in no fixed order.
+
+        The unique (habit, day) constraint means concurrent toggles can never 
+        leave duplicate rows; if an insert loses a race to another request 
+        the day is reported as completed, which is the resulting state.
+        """
+
+        offset = day.toordinal() - habit.created_at.date().toordinal()
+        connection = connections[self.db]
+        sql = self.TOGGLE_SQL.format(
+            completed_day_table=self.model._meta.db_table,
+            habit_table=habit._meta.db_table,
+            stats=','.join(
+                self.TOGGLE_STATS_SQL.format(
+                    field=field, 
+                    db_type=habit._meta.get_field(field).db_type(connection),
+                )
+                for field in habit.STATS_FIELDS
+            ),
+        )
+        params = {
+            'id': uuid.uuid4(),
+            'habit_id': habit.pk,
+            'day': day,
+            'offset': offset,
+            'length': offset // 8 + 1,
+            'updated_at': timezone.now(),
+        }
+
+        mask = habit.completion_mask
+        outcomes = {}
+        for outcome, outcome_mask in (('added', mask | 1 << offset), ('removed', mask & ~(1 << offset))):
+            habit.completion_mask = outcome_mask
+            habit.refresh_stats()
+            outcomes[outcome] = {field: getattr(habit, field) for field in habit.STATS_FIELDS}
+            params.update({f'{outcome}_{field}': value for field, value in outcomes[outcome].items()})
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            completed, completion_bits = cursor.fetchone()
+
+        habit.completion_bits = completion_bits
+        habit.updated_at = params['updated_at']
+        for field, value in outcomes['added' if completed else 'removed'].items():
+            setattr(habit, field, value)
+
+        return completed
+
+
+    def set_completed(self, ops, batch_size=None) -> list:
+        """
+        Applies (habit, day, completed) operations with one insert and one 
+        delete, or an insert per batch_size days if given, then rebuilds the 
+        touched habits' completion bits and statistics. Later operations on 
+        the same day win. Returns the updated habits.
+
+        As with toggle, concurrent callers should lock the habit rows first.
+        """
+
+        states = {(habit.pk, day): completed for habit, day, completed in ops}
+        if not states:
+            return []
+
+        with transaction.atomic(using=self.db, savepoint=False):
+            self.bulk_create(
+                [
+                    self.model(habit_id=habit_id, day=day) 
+                    for (habit_id, day), completed in states.items() if completed
+                ],
+                batch_size=batch_size,
+                ignore_conflicts=True,
+            )
+
+            removed = [key for key, completed in states.items() if not completed]
+            if removed:
+                # Raw, so the delete signals don't rebuild each habit per row.
+                with connections[self.db].cursor() as cursor:
+                    cursor.execute(
+                        self.DELETE_DAYS_SQL.format(
+                            completed_day_table=self.model._meta.db_table,
+                        ), 
+                        {
+                            'habit_ids': [habit_id for habit_id, _ in removed],
+                            'days': [day for _, day in removed],
+                        },
+                    )
+
+            habit_model = self.model._meta.get_field('habit').related_model
+            return habit_model.objects.rebuild_completions(
+                {habit_id for habit_id, _ in states}
+            )
+
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:50
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def populate_completion_bits(apps, schema_editor):
+    """
+    Packs existing CompletedDay rows into the new completion bits column.
+    """
+
+    Habit = apps.get_model('habits', 'Habit')
+    CompletedDay = apps.get_model('habits', 'CompletedDay')
+
+    days = defaultdict(list)
+    for habit_id, day in CompletedDay.objects.values_list('habit_id', 'day').iterator():
+        days[habit_id].append(day)
+
+    habits = []
+    for habit in Habit.objects.only('id', 'created_at', 'duration').iterator():
+        start = habit.created_at.date().toordinal()
+        mask = 0
+        for day in days[habit.pk]:
+            offset = day.toordinal() - start
+            if offset >= 0:
+                mask |= 1 << offset
+
+        length = max((habit.duration + 7) // 8, (mask.bit_length() + 7) // 8)
+        habit.completion_bits = mask.to_bytes(length, 'little')
+        habits.append(habit)
+
+    Habit.objects.bulk_update(habits, ['completion_bits'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habit',
+            name='completion_bits',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(populate_completion_bits, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:53
+
+from django.db import migrations, models
+
+
+def remove_duplicate_completed_days(apps, schema_editor):
+    """
+    Removes duplicate (habit, day) rows left by double-clicked toggles, so the
+    unique constraint can be added.
+    """
+
+    CompletedDay = apps.get_model('habits', 'CompletedDay')
+    seen = set()
+    duplicate_ids = []
+
+    for pk, habit_id, day in CompletedDay.objects.order_by(
+        'habit_id', 'day').values_list('id', 'habit_id', 'day').iterator():
+        if (habit_id, day) in seen:
+            duplicate_ids.append(pk)
+        else:
+            seen.add((habit_id, day))
+
+    for i in range(0, len(duplicate_ids), 1000):
+        CompletedDay.objects.filter(id__in=duplicate_ids[i:i + 1000]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0002_habit_completion_bits'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_completed_days, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='completedday',
+            constraint=models.UniqueConstraint(fields=('habit', 'day'), name='unique_completed_day'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0003_completedday_unique_completed_day'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='completedday',
+            name='habit',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='completed_days', to='habits.habit'),
+        ),
+        migrations.AddIndex(
+            model_name='habit',
+            index=models.Index(condition=models.Q(('deleted', False)), fields=['owner', 'created_at'], name='habit_active_owner_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:55
+
+import django.utils.timezone
+import habits.grid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0004_habit_and_completedday_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='completedday',
+            name='day',
+            field=models.DateField(default=habits.grid.current_day, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='habit',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 5.1.6 on 2026-10-18 19:59
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+from habits.grid import completion_stats, mask_from_bytes
+
+
+def populate_stats(apps, schema_editor):
+    """
+    Computes the statistics of existing habits from their completion bits.
+    """
+
+    Habit = apps.get_model('habits', 'Habit')
+    habits = []
+
+    for habit in Habit.objects.only('id', 'created_at', 'completion_bits').iterator():
+        stats = completion_stats(mask_from_bytes(habit.completion_bits))
+        offset = stats.pop('last_completed_offset')
+
+        for field, value in stats.items():
+            setattr(habit, field, value)
+        if offset is not None:
+            habit.last_completed_day = habit.created_at.date() + timedelta(days=offset)
+
+        habits.append(habit)
+
+    Habit.objects.bulk_update(
+        habits, 
+        ['completed_count', 'current_streak', 'longest_streak', 'last_completed_day'], 
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0005_backdatable_dates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habit',
+            name='completed_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='last_completed_day',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='longest_streak',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
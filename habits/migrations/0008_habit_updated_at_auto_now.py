@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0007_synced_operation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='habit',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
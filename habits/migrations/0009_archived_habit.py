@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0008_habit_updated_at_auto_now'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedHabit',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50)),
+                ('duration', models.IntegerField()),
+                ('created_at', models.DateTimeField(editable=False)),
+                ('deleted_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('completion_bits', models.BinaryField(default=bytes)),
+                ('completed_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('longest_streak', models.PositiveIntegerField(default=0, editable=False)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='habit',
+            index=models.Index(condition=models.Q(('deleted', True)), fields=['deleted_at'], name='habit_deleted_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedhabit',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_habits', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:45
+
+import django.db.models.expressions
+import habits.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0009_archived_habit'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='habit',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='habit',
+            name='ends_on',
+            field=models.GeneratedField(db_persist=True, expression=models.ExpressionWrapper(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(habits.models.UTCDate('created_at'), '+', models.F('duration')), '-', models.Value(1)), output_field=models.DateField()), output_field=models.DateField()),
+        ),
+        migrations.AddIndex(
+            model_name='habit',
+            index=models.Index(condition=models.Q(('complete', False), ('deleted', False)), fields=['ends_on'], name='habit_expiring_idx'),
+        ),
+    ]
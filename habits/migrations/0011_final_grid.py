@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('habits', '0010_habit_completion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FinalGrid',
+            fields=[
+                ('habit', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='final_grid', serialize=False, to='habits.habit')),
+                ('version', models.CharField(max_length=32)),
+                ('html', models.TextField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+            ],
+        ),
+    ]
@@ -1,11 +1,33 @@
 import uuid
-from datetime import date, timedelta
+from datetime import timedelta
 
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from accounts.cache import invalidate_users
+from habits.grid import (
+    HabitGrid, 
+    completion_stats, 
+    current_day, 
+    days_from_mask, 
+    mask_from_bytes, 
+    mask_to_bytes,
+)
+from habits.managers import HabitManager, CompletedDayManager
+
+
+class UTCDate(models.Func):
+    """
+    The UTC date of a timestamp. Unlike TruncDate, it doesn't depend on the 
+    connection's time zone, so it can be used in generated columns.
+    """
+
+    template = "(%(expressions)s AT TIME ZONE 'UTC')::date"
+    output_field = models.DateField()
+
 
 class Habit(models.Model):
 
@@ -24,8 +46,8 @@ class Habit(models.Model):
         primary_key=True, 
         editable=False,
     )
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
     owner = models.ForeignKey(
         get_user_model(),
         on_delete=models.CASCADE,
@@ -41,37 +63,167 @@ class Habit(models.Model):
         ]
     )
     complete = models.BooleanField(default=False)
+    completed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # The habit's last day, in UTC like current_day, so expired habits can be 
+    # found with an index.
+    ends_on = models.GeneratedField(
+        expression=models.ExpressionWrapper(
+            UTCDate('created_at') + models.F('duration') - 1,
+            output_field=models.DateField(),
+        ),
+        output_field=models.DateField(),
+        db_persist=True,
+    )
 
     deleted = models.BooleanField(default=False)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    # Bit n is set when the day n days after created_at is completed.
+    completion_bits = models.BinaryField(default=bytes, editable=False)
+
+    # Statistics derived from the completion bits, kept up to date on every 
+    # change so they can be read without scanning completed days.
+    completed_count = models.PositiveIntegerField(default=0, editable=False)
+    current_streak = models.PositiveIntegerField(default=0, editable=False)
+    longest_streak = models.PositiveIntegerField(default=0, editable=False)
+    last_completed_day = models.DateField(null=True, blank=True, editable=False)
+
+    STATS_FIELDS = (
+        'completed_count', 
+        'current_streak', 
+        'longest_streak', 
+        'last_completed_day',
+    )
+
+    objects = HabitManager()
+
+    class Meta:
+        indexes = [
+            # Active habits per owner, in sidebar order.
+            models.Index(
+                fields=['owner', 'created_at'], 
+                condition=models.Q(deleted=False),
+                name='habit_active_owner_idx',
+            ),
+            # Expired habits not yet completed, see complete_expired.
+            models.Index(
+                fields=['ends_on'], 
+                condition=models.Q(complete=False, deleted=False),
+                name='habit_expiring_idx',
+            ),
+            # Deleted habits due for archiving, see habits.archive.
+            models.Index(
+                fields=['deleted_at'], 
+                condition=models.Q(deleted=True),
+                name='habit_deleted_idx',
+            ),
+        ]
+
 
     def __str__(self):
         return self.name
     
 
-    def generate_grid(self) -> dict:
-        start_date = self.created_at.date()
-        today = date.today()
-        completed_days = set(self.completed_days.values_list("day", flat=True))
+    @property
+    def completion_mask(self) -> int:
+        return mask_from_bytes(self.completion_bits)
+
+
+    @completion_mask.setter
+    def completion_mask(self, mask: int):
+        self.completion_bits = mask_to_bytes(mask, self.duration)
+
+
+    @property
+    def last_day(self):
+        return self.created_at.date() + timedelta(days=self.duration - 1)
+
 
-        date_grid = {
-            (start_date + timedelta(days=i)): {
-                "date": (start_date + timedelta(days=i)).strftime('%Y-%m-%d'),
-                "completed": (start_date + timedelta(days=i) in completed_days),
-                "is_past": (start_date + timedelta(days=i)) < today,
-                "is_today": (start_date + timedelta(days=i)) == today,
-            }
-            for i in range(self.duration)
-        }
+    @property
+    def streak(self) -> int:
+        """
+        The current streak, which lapses once a day is missed. A completed 
+        habit's is its final streak.
+        """
 
-        return date_grid
+        if self.complete:
+            return self.current_streak
+        if self.last_completed_day and self.last_completed_day >= current_day() - timedelta(days=1):
+            return self.current_streak
+        return 0
+
+
+    def refresh_stats(self):
+        """
+        Recomputes the statistics fields from the completion bits, without 
+        saving. A completed habit's current streak is frozen at its final 
+        streak, running to its last day.
+        """
+
+        stats = completion_stats(self.completion_mask)
+        offset = stats.pop('last_completed_offset')
+
+        for field, value in stats.items():
+            setattr(self, field, value)
+
+        self.last_completed_day = (
+            None if offset is None
+            else self.created_at.date() + timedelta(days=offset)
+        )
+
+        if self.complete and self.last_completed_day != self.last_day:
+            self.current_streak = 0
+
+
+    def completed_dates(self) -> list:
+        """
+        Returns the completed days, read from the completion bits.
+        """
+
+        return list(days_from_mask(self.created_at.date(), self.completion_mask))
+
+
+    def accepts_day(self, day, today=None) -> bool:
+        """
+        Returns True if the day can be marked: from the habit's first day to 
+        its last, and not after today, unless the habit is completed.
+        """
+
+        end = min(self.last_day, today or current_day())
+        return not self.complete and self.created_at.date() <= day <= end
+
+
+    def grid(self) -> HabitGrid:
+        """
+        Returns the lazily evaluated day grid for the habit.
+        """
+
+        return HabitGrid(self.created_at.date(), self.duration, self.completion_mask)
+
+
+    def generate_grid(self) -> dict:
+        return dict(self.grid().items())
 
 
     def soft_delete(self):
+        deleted_at = timezone.now()
+
+        with transaction.atomic():
+            newly_deleted = Habit.objects.filter(pk=self.pk, deleted=False).update(
+                deleted=True, 
+                deleted_at=deleted_at,
+                updated_at=deleted_at,
+            )
+            if newly_deleted:
+                get_user_model().objects.filter(pk=self.owner_id).update(
+                    active_habit_count=Greatest(models.F('active_habit_count') - 1, 0),
+                )
+                invalidate_users(self.owner_id)
+                self.deleted_at = deleted_at
+                self.updated_at = deleted_at
+
         self.deleted = True
-        self.deleted_at = timezone.now()
-        self.save()
 
 
 class CompletedDay(models.Model):
@@ -85,10 +237,95 @@ class CompletedDay(models.Model):
         Habit,
         on_delete=models.CASCADE,
         related_name='completed_days',
+        # Covered by the unique (habit, day) constraint's index.
+        db_index=False,
     )
-    day = models.DateField(auto_now_add=True)
+    day = models.DateField(default=current_day, editable=False)
+
+    objects = CompletedDayManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['habit', 'day'], 
+                name='unique_completed_day',
+            ),
+        ]
 
 
     def __str__(self):
         return str(self.day)
 
+
+class SyncedOperation(models.Model):
+    """
+    Idempotency key of an operation synced from an offline client, recorded 
+    so a replayed operation is only applied once.
+    """
+
+    key = models.UUIDField(primary_key=True, editable=False)
+    owner = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name='synced_operations',
+    )
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+
+    def __str__(self):
+        return str(self.key)
+
+
+class ArchivedHabit(models.Model):
+    """
+    A soft deleted habit moved out of the live tables once past its 
+    retention, see habits.archive. Its completed days are kept only as its 
+    completion bits.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    owner = models.ForeignKey(
+        get_user_model(),
+        on_delete=models.CASCADE,
+        related_name='archived_habits',
+    )
+    name = models.CharField(max_length=50)
+    duration = models.IntegerField()
+    created_at = models.DateTimeField(editable=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    archived_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    # As on Habit, bit n is set when the day n days after created_at is 
+    # completed.
+    completion_bits = models.BinaryField(default=bytes, editable=False)
+    completed_count = models.PositiveIntegerField(default=0, editable=False)
+    longest_streak = models.PositiveIntegerField(default=0, editable=False)
+
+
+    def __str__(self):
+        return self.name
+
+
+    def completed_dates(self) -> list:
+        return list(days_from_mask(self.created_at.date(), mask_from_bytes(self.completion_bits)))
+
+
+class FinalGrid(models.Model):
+    """
+    The rendered grid of a completed habit, which no longer changes, stored 
+    so it can be served as is, see habits.services.store_final_grids.
+    """
+
+    habit = models.OneToOneField(
+        Habit,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='final_grid',
+    )
+    version = models.CharField(max_length=32)
+    html = models.TextField()
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+
+    def __str__(self):
+        return f'{self.habit_id} ({self.version})'
@@ -0,0 +1,256 @@
+import functools, hashlib, os, uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
+from django.template.utils import get_app_template_dirs
+
+from habits.grid import current_day
+from habits.models import Habit, CompletedDay, FinalGrid
+
+
+def get_active_habits(user) -> list:
+    """
+    Loads the user's active habits in a single query. The list feeds the
+    sidebar, and the selected habit is picked out of it rather than fetched
+    again.
+    """
+
+    return list(
+        Habit.objects.filter(owner=user, deleted=False).order_by('created_at')
+    )
+
+
+async def aget_active_habits(user) -> list:
+    """
+    Async version of get_active_habits.
+    """
+
+    return [
+        habit async for habit in 
+        Habit.objects.filter(owner=user, deleted=False).order_by('created_at')
+    ]
+
+
+# Fields a toggle reads, loaded with the locked habit.
+TOGGLE_FIELDS = ('id', 'created_at', 'duration', 'complete', 'completion_bits')
+
+
+def toggle_habit_day(user, pk, day, fields=TOGGLE_FIELDS):
+    """
+    Toggles a day of the user's habit, returning the habit and whether the 
+    day is now completed. The habit row is locked first, so concurrent 
+    toggles queue up behind it, and loaded with the given fields, which 
+    must include TOGGLE_FIELDS. Raises Http404 if the habit isn't found, is 
+    deleted or completed, or doesn't accept the day.
+    """
+
+    try:
+        pk = uuid.UUID(str(pk))
+    except ValueError:
+        raise Http404
+
+    with transaction.atomic():
+        habit = get_object_or_404(
+            Habit.objects.select_for_update(no_key=True).only(*fields), 
+            id=pk, 
+            owner=user,
+            deleted=False,
+            complete=False,
+        )
+        # Past its last day, until complete_expired_habits catches up.
+        if not habit.accepts_day(day):
+            raise Http404
+
+        completed = CompletedDay.objects.toggle(habit, day)
+
+    return habit, completed
+
+
+def set_habit_days(user, operations, today, claim=None, strict=False) -> dict:
+    """
+    Sets completed days of the user's habits from (key, habit_id, day, 
+    completed) operations, in one transaction. The habits are locked in 
+    primary key order first, so overlapping calls queue up behind each other 
+    instead of deadlocking.
+
+    Operations for a habit the user doesn't have, or a day it doesn't 
+    accept, are rejected; if strict, the first one instead raises Http404 or 
+    ValidationError and nothing is applied. If given, claim is called with 
+    the remaining operations' keys while the habits are locked, and returns 
+    the keys to apply; the others are reported as duplicates.
+
+    Returns the keys of the operations applied, duplicate and rejected, and 
+    the updated habits.
+    """
+
+    result = {'applied': [], 'duplicate': [], 'rejected': []}
+
+    with transaction.atomic():
+        habits = {
+            habit.pk: habit
+            for habit in Habit.objects.select_for_update(no_key=True).filter(
+                owner=user,
+                deleted=False,
+                pk__in={habit_id for _, habit_id, _, _ in operations},
+            ).only('id', 'created_at', 'duration', 'complete').order_by('pk')
+        }
+
+        accepted = []
+        for key, habit_id, day, completed in operations:
+            habit = habits.get(habit_id)
+
+            if habit is None and strict:
+                raise Http404
+            elif habit is None or not habit.accepts_day(day, today):
+                if strict:
+                    raise ValidationError(f'{day} is outside the habit.')
+                result['rejected'].append(key)
+            else:
+                accepted.append((key, habit, day, completed))
+
+        claimed = None if claim is None else set(claim([key for key, _, _, _ in accepted]))
+
+        ops = []
+        for key, habit, day, completed in accepted:
+            if claimed is not None and key not in claimed:
+                result['duplicate'].append(key)
+                continue
+
+            # A key repeated within the batch is only applied once.
+            if claimed is not None:
+                claimed.discard(key)
+            ops.append((habit, day, completed))
+            result['applied'].append(key)
+
+        result['habits'] = CompletedDay.objects.set_completed(ops)
+
+    return result
+
+
+def find_habit(habits, pk):
+    """
+    Returns the habit with the given primary key from a loaded list of habits,
+    or None if it isn't there.
+    """
+
+    try:
+        pk = uuid.UUID(str(pk))
+    except ValueError:
+        return None
+
+    return next((habit for habit in habits if habit.pk == pk), None)
+
+
+def habit_page_context(habit, user_habits) -> dict:
+    """
+    Builds the template context for a habit grid page. A completed habit's 
+    grid is loaded from its final grid URL instead of rendered. The "mark 
+    all" form only covers habits that accept today, as the batch view 
+    rejects the whole batch otherwise. The cached grid is keyed by release 
+    too, so a deploy that changes its markup isn't served stale.
+    """
+
+    date_grid = habit.grid()
+
+    return {
+        'habit': habit,
+        'date_grid': date_grid,
+        'batch_habits': [
+            user_habit for user_habit in user_habits 
+            if user_habit.accepts_day(date_grid.today, date_grid.today)
+        ],
+        'grid_version': habit.updated_at.isoformat(),
+        'release': release_digest(),
+        'final_grid_version': final_grid_version(habit) if habit.complete else None,
+        'user_habits': user_habits,
+    }
+
+
+@functools.cache
+def release_digest() -> str:
+    """
+    Digest of the template and static files' sizes and modification times, 
+    so page ETags change when a release changes the markup.
+    """
+
+    directories = [
+        *settings.TEMPLATES[0]['DIRS'], 
+        *get_app_template_dirs('templates'), 
+        *settings.STATICFILES_DIRS,
+    ]
+
+    digest = hashlib.md5(usedforsecurity=False)
+    for directory in directories:
+        for root, _, files in sorted(os.walk(directory)):
+            for name in sorted(files):
+                stat = os.stat(os.path.join(root, name))
+                digest.update(f'{root}/{name}:{stat.st_size}:{stat.st_mtime_ns}|'.encode())
+
+    return digest.hexdigest()
+
+
+def final_grid_version(habit) -> str:
+    """
+    Version of a completed habit's final grid, for its URL. It changes only 
+    if the habit's history is changed, e.g. by an import, or a release 
+    changes the markup.
+    """
+
+    return hashlib.md5(
+        f'{release_digest()}|{habit.pk}|{habit.updated_at.isoformat()}'.encode(), 
+        usedforsecurity=False,
+    ).hexdigest()
+
+
+def store_final_grids(habits) -> list:
+    """
+    Renders the grids of completed habits, which no longer change, and 
+    stores them to be served as they are. Returns the stored FinalGrids.
+    """
+
+    final_grids = [
+        FinalGrid(
+            habit=habit,
+            version=final_grid_version(habit),
+            html=render_to_string('habits/partials/grid.html', {
+                'habit': habit, 
+                'date_grid': habit.grid(),
+            }),
+        )
+        for habit in habits
+    ]
+
+    return FinalGrid.objects.bulk_create(
+        final_grids,
+        update_conflicts=True,
+        unique_fields=['habit'],
+        update_fields=['version', 'html', 'created_at'],
+    )
+
+
+def habit_page_etag(request, habit, user_habits) -> str:
+    """
+    Returns an ETag over everything a habit page is rendered from: the 
+    release, the user, the CSRF secret in its forms, today, the selected 
+    habit, and the version of each habit in the sidebar.
+    """
+
+    digest = hashlib.md5(usedforsecurity=False)
+    for part in (
+        release_digest(), 
+        request.user.pk, 
+        request.META.get('CSRF_COOKIE', ''), 
+        current_day(), 
+        habit.pk,
+    ):
+        digest.update(f'{part}|'.encode())
+
+    for user_habit in user_habits:
+        digest.update(f'{user_habit.pk}:{user_habit.updated_at.isoformat()}|'.encode())
+
+    return f'"{digest.hexdigest()}"'
+
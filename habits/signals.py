@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.cache import invalidate_users
+from habits.models import Habit, CompletedDay
+
+
+def _sync_completion_bits(instance):
+    habits = Habit.objects.rebuild_completions([instance.habit_id])
+
+    # Keep an already loaded habit in step with the database.
+    if habits and CompletedDay.habit.is_cached(instance):
+        for field in ('completion_bits', 'updated_at', *Habit.STATS_FIELDS):
+            setattr(instance.habit, field, getattr(habits[0], field))
+
+
+@receiver(post_save, sender=CompletedDay)
+def set_completion_bit(sender, instance, **kwargs):
+    _sync_completion_bits(instance)
+
+
+@receiver(post_delete, sender=CompletedDay)
+def clear_completion_bit(sender, instance, origin=None, **kwargs):
+    # Skip cascades from deleting the habit or its owner.
+    if isinstance(origin, CompletedDay) or getattr(origin, 'model', None) is CompletedDay:
+        _sync_completion_bits(instance)
+
+
+@receiver(pre_save, sender=Habit)
+def load_previously_deleted(sender, instance, update_fields=None, **kwargs):
+    # Read before saving, so an admin deleting or restoring a habit moves the 
+    # count. New habits, and saves leaving deleted alone, skip the query.
+    if instance._state.adding:
+        instance._previously_deleted = None
+    elif update_fields is not None and 'deleted' not in update_fields:
+        instance._previously_deleted = instance.deleted
+    else:
+        instance._previously_deleted = Habit.objects.filter(
+            pk=instance.pk).values_list('deleted', flat=True).first()
+
+
+@receiver(post_save, sender=Habit)
+def update_active_habit_count(sender, instance, **kwargs):
+    was_active = getattr(instance, '_previously_deleted', None) is False
+    if was_active == (not instance.deleted):
+        return
+
+    get_user_model().objects.filter(pk=instance.owner_id).update(
+        active_habit_count=(
+            Greatest(F('active_habit_count') - 1, 0) if was_active 
+            else F('active_habit_count') + 1
+        ),
+    )
+    invalidate_users(instance.owner_id)
+
+
+@receiver(post_delete, sender=Habit)
+def decrement_active_habit_count(sender, instance, **kwargs):
+    if not instance.deleted:
+        get_user_model().objects.filter(pk=instance.owner_id).update(
+            active_habit_count=Greatest(F('active_habit_count') - 1, 0),
+        )
+        invalidate_users(instance.owner_id)
@@ -0,0 +1,60 @@
+import uuid
+from datetime import date
+
+from habits.grid import current_day
+from habits.models import SyncedOperation
+from habits.services import set_habit_days
+
+
+# Most operations accepted by one sync request.
+MAX_SYNC_OPS = 100
+
+
+def _parse_operation(operation):
+    # Only JSON booleans, so a string like "false" isn't taken as completed.
+    if not isinstance(operation['state'], bool):
+        raise TypeError('state must be a boolean')
+
+    return (
+        uuid.UUID(str(operation['key'])),
+        uuid.UUID(str(operation['habit_id'])),
+        date.fromisoformat(str(operation['day'])),
+        operation['state'],
+    )
+
+
+def apply_operations(user, operations) -> dict:
+    """
+    Applies operations queued by an offline client to the user's habits.
+    Each operation sets a habit's day to a completed state, and carries a
+    client generated key so it is applied at most once however often it is
+    replayed. Operations are applied in order, in one transaction.
+
+    Returns the keys of the operations applied, already applied before
+    (duplicate), and rejected as malformed, for a missing habit or for a day
+    the habit doesn't accept. The client can drop all of them from its queue.
+    """
+
+    result = {'applied': [], 'duplicate': [], 'rejected': []}
+
+    parsed = []
+    for operation in operations:
+        try:
+            parsed.append(_parse_operation(operation))
+        except (KeyError, TypeError, ValueError):
+            key = operation.get('key') if isinstance(operation, dict) else None
+            result['rejected'].append(str(key))
+
+    def claim(keys):
+        # Keys are unique across users, so any match is treated as applied.
+        seen = set(SyncedOperation.objects.filter(key__in=keys).values_list('key', flat=True))
+        new = list(dict.fromkeys(key for key in keys if key not in seen))
+        SyncedOperation.objects.bulk_create(SyncedOperation(key=key, owner=user) for key in new)
+        return new
+
+    outcomes = set_habit_days(user, parsed, current_day(), claim=claim)
+
+    for outcome in result:
+        result[outcome].extend(str(key) for key in outcomes[outcome])
+
+    return result
@@ -0,0 +1,141 @@
+import base64
+from datetime import timedelta
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from habits.models import Habit, CompletedDay
+
+
+class HabitApiTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            first_name = 'Test',
+            last_name = 'User',
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+
+        self.habit = Habit.objects.create(
+            owner = self.user,
+            name = 'A Test Habit',
+            duration = 7,
+        )
+
+
+    def test_api_user_logged_out(self):
+        """
+        Test anonymous API requests get a 401 JSON error, not a redirect.
+        """
+
+        response = self.client.get(reverse('api_habits'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {'error': 'Authentication required.'})
+
+
+    def test_habits_api_conditional_get(self):
+        """
+        Test the habit list answers a matching If-None-Match with a 304,
+        until a habit changes.
+        """
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.get(reverse('api_habits'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([habit['name'] for habit in response.json()['habits']], ['A Test Habit'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.client.get(reverse('api_habits'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        CompletedDay.objects.create(habit=self.habit)
+
+        response = self.client.get(reverse('api_habits'), headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['habits'][0]['completed_count'], 1)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+    def test_habit_api_bitmap(self):
+        """
+        Test a habit is returned with its completion bitmap, and other users'
+        habits are not found.
+        """
+
+        CompletedDay.objects.create(habit=self.habit)
+        other_user = get_user_model().objects.create_user(email='other.user@email.com', password='TestPass123')
+        other_habit = Habit.objects.create(owner=other_user, name='Other Habit', duration=7)
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.get(reverse('api_habit', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.status_code, 200)
+
+        habit = response.json()['habit']
+        self.assertEqual(habit['start_date'], str(timezone.now().date()))
+        self.assertEqual(base64.b64decode(habit['completion_bitmap']), b'\x01')
+        self.assertEqual(habit['current_streak'], 1)
+
+        response = self.client.get(reverse('api_habit', kwargs={'pk': other_habit.pk}))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse('api_habit', kwargs={'pk': 'not-a-habit'}))
+        self.assertEqual(response.status_code, 404)
+
+
+    def test_habit_toggle_api(self):
+        """
+        Test toggling through the API returns the updated habit with a new
+        ETag, and only accepts POST.
+        """
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        etag = self.client.get(reverse('api_habit', kwargs={'pk': self.habit.pk}))['ETag']
+
+        response = self.client.get(reverse('api_habit_toggle', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.status_code, 405)
+
+        response = self.client.post(reverse('api_habit_toggle', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['habit']['completed_count'], 1)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertTrue(CompletedDay.objects.filter(habit=self.habit).exists())
+
+        response = self.client.get(
+            reverse('api_habit', kwargs={'pk': self.habit.pk}),
+            headers={'If-None-Match': response['ETag']},
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.post(reverse('api_habit_toggle', kwargs={'pk': 'not-a-habit'}))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Not found.'})
+
+
+    def test_habit_api_if_modified_since(self):
+        """
+        Test a habit's Last-Modified is honoured when no ETag is sent.
+        """
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+        url = reverse('api_habit', kwargs={'pk': self.habit.pk})
+
+        last_modified = self.client.get(url)['Last-Modified']
+
+        response = self.client.get(url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 304)
+
+        Habit.objects.filter(pk=self.habit.pk).update(
+            updated_at=timezone.now() + timedelta(seconds=2)
+        )
+
+        response = self.client.get(url, headers={'If-Modified-Since': last_modified})
+        self.assertEqual(response.status_code, 200)
+
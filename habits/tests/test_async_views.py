@@ -0,0 +1,104 @@
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import include, path, reverse
+
+from habits import async_views
+from habits.models import Habit, CompletedDay
+
+
+# The project's URLs, with the async views in front of the sync ones.
+urlpatterns = [
+    path('', async_views.home_view, name='home'),
+    path('habit/<str:pk>/', async_views.habit_view, name='habit'),
+    path('habit-day-toggle/<str:pk>/', async_views.toggle_completed_day_view, name='habit_completed_day_toggle'),
+    path('export/', async_views.export_view, name='export_habits'),
+    path('', include('config.urls')),
+]
+
+
+@override_settings(ROOT_URLCONF='habits.tests.test_async_views')
+class AsyncHabitViewTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            first_name = 'Test',
+            last_name = 'User',
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+
+        self.habit = Habit.objects.create(
+            owner = self.user,
+            name = 'A Test Habit',
+            duration = 7,
+        )
+
+
+    async def test_async_views_user_logged_out(self):
+        """
+        Test the async views redirect to login without a logged in user.
+        """
+
+        response = await self.async_client.get(reverse('habit', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.status_code, 302)
+
+
+    async def test_async_home_and_habit_views(self):
+        """
+        Test the async pages render the same habit page as the sync views, 
+        with their queries timed for staff.
+        """
+
+        await get_user_model().objects.filter(pk=self.user.pk).aupdate(is_staff=True)
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'habits/habit.html')
+        self.assertContains(response, 'A Test Habit')
+
+        response = await self.async_client.get(reverse('habit', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+        response = await self.async_client.get(reverse('habit', kwargs={'pk': 'not-a-habit'}))
+        self.assertEqual(response.status_code, 404)
+
+
+    async def test_async_toggle_completed_day_view(self):
+        """
+        Test the async toggle creates then removes today's completed day.
+        """
+
+        await self.async_client.aforce_login(self.user)
+        url = reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk})
+
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 405)
+
+        response = await self.async_client.post(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '1/7 days')
+        self.assertTrue(await CompletedDay.objects.filter(habit=self.habit).aexists())
+
+        response = await self.async_client.post(url)
+        self.assertContains(response, '0/7 days')
+        self.assertFalse(await CompletedDay.objects.filter(habit=self.habit).aexists())
+
+
+    async def test_async_export_view_streams_asynchronously(self):
+        """
+        Test the async export streams the same lines through an async 
+        iterator, so ASGI servers don't buffer it.
+        """
+
+        await CompletedDay.objects.acreate(habit=self.habit)
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(reverse('export_habits') + '?format=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+
+        content = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(len(content.decode().splitlines()), 1)
+        self.assertIn(str(self.habit.pk), content.decode())
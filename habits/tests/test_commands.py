@@ -0,0 +1,212 @@
+import json, os, tempfile, uuid
+from datetime import timedelta
+from io import StringIO
+
+from django.test import TestCase
+from django.core.management import call_command
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from habits.management.commands.benchmark_habits import Command as BenchmarkHabitsCommand
+from habits.models import Habit, ArchivedHabit, CompletedDay, FinalGrid, SyncedOperation
+
+
+class BenchmarkHabitsCommandTests(TestCase):
+
+    def test_benchmark_habits_writes_results(self):
+        """
+        Test the benchmark writes a result per case, and leaves no data behind.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            call_command(
+                'benchmark_habits', 
+                repeats=2, 
+                durations=[7], 
+                habits=[1], 
+                output=output, 
+                stdout=StringIO(),
+            )
+
+            with open(output) as f:
+                results = json.load(f)['results']
+
+        self.assertEqual(
+            [result['case'] for result in results],
+            [
+                'home_view', 
+                'habit_view', 
+                'toggle_completed_day_view', 
+                'set_completed_days_view', 
+                'generate_grid',
+                'render_grid',
+            ],
+        )
+        self.assertEqual(results[1]['queries'], 3)
+        self.assertFalse(Habit.objects.exists())
+
+
+    def test_benchmark_habits_data_has_statistics(self):
+        """
+        Test the bulk created benchmark habits carry statistics matching 
+        their completion history.
+        """
+
+        command = BenchmarkHabitsCommand()
+        command.options = {'density': 1.0}
+        habit = command.create_user_habits(duration=7, habit_count=1)[0]
+        habit.refresh_from_db()
+
+        self.assertEqual(habit.completed_count, 3)
+        self.assertEqual(habit.longest_streak, 3)
+        self.assertEqual(habit.streak, 3)
+
+
+class RecomputeHabitStatsCommandTests(TestCase):
+
+    def test_recompute_habit_stats_repairs_drift(self):
+        user = get_user_model().objects.create_user(
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+        habit = Habit.objects.create(owner=user, name='A Test Habit', duration=7)
+        CompletedDay.objects.create(habit=habit)
+
+        Habit.objects.filter(id=habit.id).update(
+            completion_bits=b'', 
+            completed_count=5, 
+            current_streak=5,
+        )
+
+        call_command('recompute_habit_stats', stdout=StringIO())
+        habit.refresh_from_db()
+
+        self.assertEqual(habit.completion_mask, 1)
+        self.assertEqual(habit.completed_count, 1)
+        self.assertEqual(habit.current_streak, 1)
+        self.assertEqual(habit.longest_streak, 1)
+
+
+class ArchiveDeletedHabitsCommandTests(TestCase):
+
+    def test_archive_deleted_habits_after_retention(self):
+        """
+        Test habits soft deleted before the retention period are archived 
+        with their completion bits and removed, along with old sync keys, 
+        leaving recent and active habits alone.
+        """
+
+        user = get_user_model().objects.create_user(
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+        old = Habit.objects.create(owner=user, name='Old Habit', duration=7)
+        recent = Habit.objects.create(owner=user, name='Recent Habit', duration=7)
+        active = Habit.objects.create(owner=user, name='Active Habit', duration=7)
+        for habit in (old, recent, active):
+            CompletedDay.objects.create(habit=habit)
+        old.soft_delete()
+        recent.soft_delete()
+
+        Habit.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=31))
+        SyncedOperation.objects.create(
+            key=uuid.uuid4(), owner=user, created_at=timezone.now() - timedelta(days=31),
+        )
+        SyncedOperation.objects.create(key=uuid.uuid4(), owner=user)
+
+        out = StringIO()
+        call_command('archive_deleted_habits', '--days', '30', '--batch-size', '1', stdout=out)
+
+        self.assertIn('Archived 1 habits and deleted 1 sync keys.', out.getvalue())
+        self.assertEqual(set(Habit.objects.values_list('name', flat=True)), {'Recent Habit', 'Active Habit'})
+        self.assertEqual(CompletedDay.objects.count(), 2)
+        self.assertEqual(SyncedOperation.objects.count(), 1)
+
+        archived = ArchivedHabit.objects.get()
+        self.assertEqual(archived.pk, old.pk)
+        self.assertEqual(archived.completed_count, 1)
+        self.assertEqual(archived.completed_dates(), [old.created_at.date()])
+
+
+class CompleteExpiredHabitsCommandTests(TestCase):
+
+    def test_complete_expired_habits(self):
+        user = get_user_model().objects.create_user(
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+        Habit.objects.create(owner=user, name='Running Habit', duration=7)
+        for days in (8, 30):
+            Habit.objects.create(
+                owner=user, name=f'Expired Habit {days}', duration=7,
+                created_at=timezone.now() - timedelta(days=days),
+            )
+
+        out = StringIO()
+        call_command('complete_expired_habits', '--batch-size', '1', stdout=out)
+
+        self.assertIn('Completed 2 expired habits.', out.getvalue())
+        self.assertEqual(
+            set(Habit.objects.filter(complete=True).values_list('name', flat=True)), 
+            {'Expired Habit 8', 'Expired Habit 30'},
+        )
+        self.assertEqual(FinalGrid.objects.count(), 2)
+
+
+class ExportHabitsCommandTests(TestCase):
+
+    def test_export_habits_ndjson(self):
+        """
+        Test the export command writes every user's habits, leaving out 
+        deleted habits unless asked for them.
+        """
+
+        for email in ('first.user@email.com', 'second.user@email.com'):
+            user = get_user_model().objects.create_user(email=email, password='TestPass123')
+            habit = Habit.objects.create(owner=user, name='A Test Habit', duration=7)
+            CompletedDay.objects.create(habit=habit)
+
+        habit.soft_delete()
+
+        stdout = StringIO()
+        call_command('export_habits', format='ndjson', stdout=stdout)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+        self.assertEqual([record['owner'] for record in records], ['first.user@email.com'])
+
+        stdout = StringIO()
+        call_command('export_habits', format='ndjson', include_deleted=True, stdout=stdout)
+
+        self.assertEqual(len(stdout.getvalue().splitlines()), 2)
+
+
+class ImportHabitsCommandTests(TestCase):
+
+    def test_import_habits_round_trips_export(self):
+        """
+        Test a user's export can be imported back after their completed days 
+        are lost.
+        """
+
+        user = get_user_model().objects.create_user(email='test.user@email.com', password='TestPass123')
+        habit = Habit.objects.create(owner=user, name='A Test Habit', duration=7)
+        CompletedDay.objects.create(habit=habit)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'habits.csv')
+            call_command('export_habits', user.email, output=path, stdout=StringIO())
+
+            CompletedDay.objects.all().delete()
+            habit.refresh_from_db()
+            self.assertEqual(habit.completed_count, 0)
+
+            stdout = StringIO()
+            call_command('import_habits', user.email, path, stdout=stdout)
+
+        self.assertIn('Imported 1 days across 1 habits', stdout.getvalue())
+        habit.refresh_from_db()
+        self.assertEqual(habit.completed_count, 1)
+        self.assertEqual(CompletedDay.objects.filter(habit=habit).count(), 1)
+
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+from django.test import SimpleTestCase
+
+from habits.grid import HabitGrid, mask_from_days
+
+
+class HabitGridTests(SimpleTestCase):
+
+    def setUp(self):
+        self.start_date = date(2025, 1, 1)
+        self.today = date(2025, 1, 3)
+
+
+    def test_mask_from_days(self):
+        """
+        Test days are packed as bits offset from the start date, ignoring days
+        before the start date.
+        """
+
+        days = [
+            date(2024, 12, 31),
+            date(2025, 1, 1),
+            date(2025, 1, 4),
+        ]
+
+        self.assertEqual(mask_from_days(self.start_date, days), 0b1001)
+        self.assertEqual(mask_from_days(self.start_date, []), 0)
+
+
+    def test_grid_cells(self):
+        """
+        Test the grid yields a cell per day, marking completed days, and days 
+        before and on today.
+        """
+
+        grid = HabitGrid(self.start_date, 7, 0b101, self.today)
+        cells = list(grid)
+
+        self.assertEqual(len(grid), 7)
+        self.assertEqual(len(cells), 7)
+        self.assertEqual(
+            cells[0],
+            {'date': '2025-01-01', 'completed': True, 'is_past': True, 'is_today': False},
+        )
+        self.assertEqual(
+            cells[2],
+            {'date': '2025-01-03', 'completed': True, 'is_past': False, 'is_today': True},
+        )
+        self.assertEqual(
+            cells[6],
+            {'date': '2025-01-07', 'completed': False, 'is_past': False, 'is_today': False},
+        )
+
+
+    def test_grid_items_match_legacy_grid(self):
+        """
+        Test grid items match the output of the original dict based grid.
+        """
+
+        duration = 365
+        completed_days = {self.start_date + timedelta(days=i) for i in range(0, duration, 3)}
+        grid = HabitGrid(
+            self.start_date,
+            duration,
+            mask_from_days(self.start_date, completed_days),
+            self.today,
+        )
+
+        legacy_grid = {
+            (self.start_date + timedelta(days=i)): {
+                "date": (self.start_date + timedelta(days=i)).strftime('%Y-%m-%d'),
+                "completed": (self.start_date + timedelta(days=i) in completed_days),
+                "is_past": (self.start_date + timedelta(days=i)) < self.today,
+                "is_today": (self.start_date + timedelta(days=i)) == self.today,
+            }
+            for i in range(duration)
+        }
+
+        self.assertEqual(dict(grid.items()), legacy_grid)
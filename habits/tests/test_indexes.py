@@ -0,0 +1,70 @@
+import random
+
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+from habits.models import Habit, CompletedDay
+
+
+class HabitIndexTests(TestCase):
+    """
+    Checks the query planner uses the habit indexes for the views' access
+    patterns, against a seeded dataset large enough that a sequential scan
+    would be the worse plan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        random.seed(0)
+
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(email=f'user{i}@email.com', password='!')
+            for i in range(300)
+        )
+
+        habits = Habit.objects.bulk_create(
+            Habit(
+                owner=user,
+                name=f'Habit {i}',
+                duration=60,
+                deleted=random.random() < 0.3,
+            )
+            for user in users
+            for i in range(5)
+        )
+
+        # Histories are inserted with one statement to keep setup fast.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {CompletedDay._meta.db_table} (id, habit_id, day) "
+                f"SELECT gen_random_uuid(), habit.id, CURRENT_DATE - offsets.day "
+                f"FROM {Habit._meta.db_table} habit, generate_series(0, 19) offsets(day)"
+            )
+            cursor.execute(f'ANALYZE {Habit._meta.db_table}')
+            cursor.execute(f'ANALYZE {CompletedDay._meta.db_table}')
+
+        cls.user = users[0]
+        cls.habit = habits[0]
+
+
+    def test_active_habits_use_partial_owner_index(self):
+        plan = Habit.objects.filter(
+            owner=self.user, deleted=False).order_by('created_at').explain()
+
+        self.assertIn('habit_active_owner_idx', plan)
+
+
+    def test_completed_day_lookup_uses_unique_index(self):
+        plan = CompletedDay.objects.filter(
+            habit=self.habit, day=timezone.now().date()).explain()
+
+        self.assertIn('unique_completed_day', plan)
+
+
+    def test_completed_days_per_habit_use_unique_index(self):
+        plan = CompletedDay.objects.filter(
+            habit__in=[self.habit.pk]).values_list('habit_id', 'day').explain()
+
+        self.assertIn('unique_completed_day', plan)
@@ -1,7 +1,10 @@
+from datetime import timedelta
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
 
 from habits.models import Habit, CompletedDay
 
@@ -77,4 +80,171 @@ class HabitModelTests(TestCase):
 
 
     def test_completed_day_string_method(self):
-        self.assertEqual(str(self.completed_day), self.today_str)
\ No newline at end of file
+        self.assertEqual(str(self.completed_day), self.today_str)
+
+    def test_completed_day_sets_completion_bits(self):
+        """
+        Test creating and deleting completed days keeps the habit completion 
+        bits in sync, for both the loaded habit and the database row.
+        """
+
+        self.assertEqual(self.habit.completion_mask, 1)
+        self.assertEqual(Habit.objects.get(id=self.habit.id).completion_mask, 1)
+        self.assertEqual(self.habit.completed_dates(), [self.completed_day.day])
+
+        self.completed_day.delete()
+
+        self.assertEqual(self.habit.completion_mask, 0)
+        self.assertEqual(Habit.objects.get(id=self.habit.id).completion_mask, 0)
+
+
+    def test_habit_grid_reads_completion_bits(self):
+        """
+        Test the habit grid is built from the habit row, without querying 
+        completed days.
+        """
+
+        habit = Habit.objects.get(id=self.habit.id)
+
+        with self.assertNumQueries(0):
+            grid = list(habit.grid())
+
+        self.assertEqual(len(grid), 7)
+        self.assertTrue(grid[0]['completed'])
+
+
+
+    def test_completed_day_unique_per_habit_and_day(self):
+        with self.assertRaises(IntegrityError):
+            with transaction.atomic():
+                CompletedDay.objects.create(habit=self.habit)
+
+
+    def test_completed_day_manager_toggle(self):
+        """
+        Test toggle removes an existing completed day, then recreates it, 
+        keeping the completion bits in step.
+        """
+
+        today = timezone.now().date()
+
+        completed = CompletedDay.objects.toggle(self.habit, today)
+
+        self.assertFalse(completed)
+        self.assertFalse(CompletedDay.objects.filter(habit=self.habit).exists())
+        self.assertEqual(Habit.objects.get(id=self.habit.id).completion_mask, 0)
+
+        completed = CompletedDay.objects.toggle(self.habit, today)
+
+        self.assertTrue(completed)
+        self.assertEqual(CompletedDay.objects.filter(habit=self.habit, day=today).count(), 1)
+        self.assertEqual(Habit.objects.get(id=self.habit.id).completion_mask, 1)
+        self.assertEqual(self.habit.completion_mask, 1)
+
+
+
+    def test_habit_updated_at_tracks_changes(self):
+        """
+        Test updated_at moves on every toggle, rename and soft delete.
+        """
+
+        def updated_at():
+            return Habit.objects.values_list('updated_at', flat=True).get(id=self.habit.id)
+
+        before = updated_at()
+        CompletedDay.objects.toggle(self.habit, timezone.now().date())
+        self.assertGreater(updated_at(), before)
+        self.assertEqual(self.habit.updated_at, updated_at())
+
+        before = updated_at()
+        self.habit.name = 'A Renamed Habit'
+        self.habit.save()
+        self.assertGreater(updated_at(), before)
+
+        before = updated_at()
+        self.habit.soft_delete()
+        self.assertGreater(updated_at(), before)
+
+
+    def test_habit_stats_maintained_on_toggle(self):
+        """
+        Test the habit statistics follow completed days being toggled.
+        """
+
+        today = timezone.now().date()
+        habit = Habit.objects.get(id=self.habit.id)
+
+        self.assertEqual(habit.completed_count, 1)
+        self.assertEqual(habit.current_streak, 1)
+        self.assertEqual(habit.longest_streak, 1)
+        self.assertEqual(habit.last_completed_day, today)
+        self.assertEqual(habit.streak, 1)
+
+        CompletedDay.objects.toggle(self.habit, today)
+        habit.refresh_from_db()
+
+        self.assertEqual(habit.completed_count, 0)
+        self.assertEqual(habit.current_streak, 0)
+        self.assertEqual(habit.longest_streak, 0)
+        self.assertIsNone(habit.last_completed_day)
+
+
+    def test_habit_stats_from_history(self):
+        """
+        Test streaks are computed across a history with gaps, and that a 
+        streak lapses once a day has been missed.
+        """
+
+        self.completed_day.delete()
+        habit = Habit.objects.create(
+            owner = self.user,
+            name = 'A Habit With History',
+            duration = 30,
+            created_at = timezone.now() - timedelta(days=10),
+        )
+        start = habit.created_at.date()
+
+        for offset in (0, 1, 2, 4, 5, 7):
+            CompletedDay.objects.create(habit=habit, day=start + timedelta(days=offset))
+
+        habit.refresh_from_db()
+
+        self.assertEqual(habit.completed_count, 6)
+        self.assertEqual(habit.longest_streak, 3)
+        self.assertEqual(habit.current_streak, 1)
+        self.assertEqual(habit.last_completed_day, start + timedelta(days=7))
+        self.assertEqual(habit.streak, 0)
+
+
+    def test_habit_complete_expired(self):
+        """
+        Test habits past their last day are completed with frozen statistics, 
+        and then no longer accept days, while running habits are untouched.
+        """
+
+        habit = Habit.objects.create(
+            owner = self.user,
+            name = 'An Expired Habit',
+            duration = 7,
+            created_at = timezone.now() - timedelta(days=10),
+        )
+        start = habit.created_at.date()
+
+        for offset in (0, 1, 6):
+            CompletedDay.objects.create(habit=habit, day=start + timedelta(days=offset))
+
+        completed = Habit.objects.complete_expired(start + timedelta(days=10))
+        habit.refresh_from_db()
+        self.habit.refresh_from_db()
+
+        self.assertEqual(completed, [habit])
+        self.assertTrue(habit.complete)
+        self.assertIsNotNone(habit.completed_at)
+        self.assertEqual(habit.ends_on, start + timedelta(days=6))
+        self.assertEqual(habit.completed_count, 3)
+        self.assertEqual(habit.longest_streak, 2)
+        self.assertEqual(habit.streak, 1)
+        self.assertFalse(habit.accepts_day(start + timedelta(days=6)))
+        self.assertFalse(self.habit.complete)
+
+        self.assertEqual(Habit.objects.complete_expired(start + timedelta(days=10)), [])
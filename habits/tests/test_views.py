@@ -1,10 +1,16 @@
-from django.test import TestCase
+import json, threading, uuid
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.db import connection
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
+from django.core.files.uploadedfile import SimpleUploadedFile
 
-from habits.models import Habit, CompletedDay
+from habits.models import Habit, CompletedDay, FinalGrid
 
 
 class HabitViewTests(TestCase):
@@ -102,6 +108,79 @@ class HabitViewTests(TestCase):
         self.assertContains(response, 'A Test Habit')
     
     
+    def test_habit_view_grid_cached_until_toggle(self):
+        """
+        Test the rendered grid is served from cache on repeat page loads, and 
+        re-rendered after a release or once the day is toggled.
+        """
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+        url = reverse('habit', kwargs={'pk': self.habit.pk})
+
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'habits/partials/grid.html')
+
+        response = self.client.get(url)
+        self.assertTemplateNotUsed(response, 'habits/partials/grid.html')
+        self.assertContains(response, 'id="today"')
+
+        with mock.patch('habits.services.release_digest', return_value='next-release'):
+            response = self.client.get(url)
+            self.assertTemplateUsed(response, 'habits/partials/grid.html')
+
+        self.client.post(reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk}))
+
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'habits/partials/grid.html')
+        self.assertContains(response, 'id="today" class="aspect-square bg-pink-800')
+
+
+    def test_habit_view_not_modified(self):
+        """
+        Test a repeat page load with the page's ETag gets a 304 without 
+        rendering, until the habit is toggled.
+        """
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+        url = reverse('habit', kwargs={'pk': self.habit.pk})
+
+        # The first load sets the CSRF cookie, which the page depends on.
+        self.client.get(url)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertTemplateNotUsed(response, 'habits/habit.html')
+
+        self.client.post(reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk}))
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+    def test_home_view_shows_most_recently_updated_habit(self):
+        """
+        Test the home page shows the habit most recently toggled.
+        """
+
+        other_habit = Habit.objects.create(owner=self.user, name='Other Habit', duration=7)
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['habit'], other_habit)
+
+        self.client.post(reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk}))
+
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['habit'], self.habit)
+
+
     # Create Habit
     def test_create_habit_view_user_logged_out(self):
         """
@@ -156,6 +235,26 @@ class HabitViewTests(TestCase):
             self.fail('New habit could not be found.')
 
 
+    def test_create_habit_view_user_at_habit_limit_post(self):
+        """
+        Tests no habit is created on POST to create habit view once the user 
+        has reached their habit limit, and that they are redirected.
+        """
+
+        get_user_model().objects.filter(pk=self.user.pk).update(habit_limit=1)
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        form_data = {
+           'name': 'Another Test Habit', 
+           'duration': 30,
+        }
+
+        response = self.client.post(reverse('create_habit'), data=form_data)
+        self.assertRedirects(response, reverse('max_habits_created'))
+        self.assertFalse(Habit.objects.filter(name='Another Test Habit').exists())
+
+
     # Max Habits Created
     def test_create_habit_view_user_logged_out(self):
         """
@@ -204,6 +303,76 @@ class HabitViewTests(TestCase):
         self.assertEqual(response.status_code, 405)
 
 
+    def test_toggle_completed_day_view_completed_habit(self):
+        """
+        Test a completed habit can't be toggled, and its page has no toggle.
+        """
+
+        Habit.objects.filter(pk=self.habit.pk).update(complete=True)
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.post(reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(CompletedDay.objects.filter(habit=self.habit).exists())
+
+        response = self.client.get(reverse('habit', kwargs={'pk': self.habit.pk}))
+        self.assertNotContains(response, 'data-offline-toggle')
+
+
+    def test_toggle_completed_day_view_expired_or_deleted_habit(self):
+        """
+        Test a habit past its last day, but not yet marked completed, or a 
+        soft deleted habit, can't be toggled.
+        """
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+        url = reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk})
+
+        Habit.objects.filter(pk=self.habit.pk).update(created_at=timezone.now() - timedelta(days=10))
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(CompletedDay.objects.filter(habit=self.habit).exists())
+
+        Habit.objects.filter(pk=self.habit.pk).update(created_at=timezone.now())
+        self.habit.refresh_from_db()
+        self.habit.soft_delete()
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(CompletedDay.objects.filter(habit=self.habit).exists())
+
+
+    def test_final_grid_view_serves_stored_grid(self):
+        """
+        Test a completed habit's page loads its grid from a versioned URL, 
+        whose response is stored once and marked immutable.
+        """
+
+        Habit.objects.filter(pk=self.habit.pk).update(
+            created_at=timezone.now() - timedelta(days=10), 
+            complete=True,
+        )
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.get(reverse('habit', kwargs={'pk': self.habit.pk}))
+        url = reverse('habit_final_grid', kwargs={
+            'pk': self.habit.pk, 
+            'version': response.context['final_grid_version'],
+        })
+        self.assertContains(response, f'hx-get="{url}"')
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertContains(response, 'bg-zinc-700', count=7)
+        self.assertNotContains(response, 'animate-pulse')
+        self.assertEqual(FinalGrid.objects.get(habit=self.habit).html, response.content.decode())
+
+        self.assertEqual(self.client.get(url).content, response.content)
+
+        response = self.client.get(reverse('habit_final_grid', kwargs={'pk': self.habit.pk, 'version': 'stale'}))
+        self.assertEqual(response.status_code, 404)
+
+
     def test_toggle_completed_day_view_user_logged_in_post(self):
         """
         Test toggle completed day view creates new completed day object on 
@@ -216,6 +385,7 @@ class HabitViewTests(TestCase):
         # Create CompletedDay object on first request
         response = self.client.post(reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk}))
         self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '1/7 days')
 
         try:
             new_completed_day = CompletedDay.objects.get(
@@ -240,6 +410,260 @@ class HabitViewTests(TestCase):
             pass
 
 
+    # Set Completed Days
+    def test_set_completed_days_view_user_logged_in_post(self):
+        """
+        Test the batch view sets days across habits in one request, returning 
+        each updated cell and habit's statistics as out of band swaps.
+        """
+
+        other_habit = Habit.objects.create(owner=self.user, name='Other Habit', duration=7)
+        CompletedDay.objects.create(habit=other_habit)
+        today = str(timezone.now().date())
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.post(reverse('habit_completed_days_set'), {
+            'habit_id': [self.habit.pk, other_habit.pk, self.habit.pk],
+            'day': [today, today, today],
+            'state': ['0', '0', '1'],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, f"hx-swap-oob=\"outerHTML:#grid-{self.habit.pk} [id='today']\"")
+        self.assertContains(response, f"#habit-stats[data-habit='{other_habit.pk}']")
+        self.assertContains(response, '1/7 days')
+        self.assertContains(response, '0/7 days')
+
+        self.assertTrue(CompletedDay.objects.filter(habit=self.habit).exists())
+        self.assertFalse(CompletedDay.objects.filter(habit=other_habit).exists())
+
+        other_habit.refresh_from_db()
+        self.assertEqual(other_habit.completion_mask, 0)
+        self.assertEqual(other_habit.completed_count, 0)
+
+
+    def test_habit_view_mark_all_form_skips_ended_habits(self):
+        """
+        Test the "mark all" form leaves out a habit past its last day that 
+        isn't completed yet, so submitting it marks the others.
+        """
+
+        ended_habit = Habit.objects.create(
+            owner=self.user, 
+            name='Ended Habit', 
+            duration=7, 
+            created_at=timezone.now() - timedelta(days=10),
+        )
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.get(reverse('habit', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.context['batch_habits'], [self.habit])
+        self.assertContains(response, f'name="habit_id" value="{self.habit.pk}"')
+        self.assertNotContains(response, f'name="habit_id" value="{ended_habit.pk}"')
+
+        today = str(timezone.now().date())
+        response = self.client.post(reverse('habit_completed_days_set'), {
+            'habit_id': [self.habit.pk], 'day': [today], 'state': ['1'],
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(CompletedDay.objects.filter(habit=self.habit).exists())
+
+
+    def test_set_completed_days_view_rejects_invalid_operations(self):
+        """
+        Test the batch view applies nothing if any operation is invalid, and 
+        can't touch another user's habits.
+        """
+
+        other_user = get_user_model().objects.create_user(email='other.user@email.com', password='TestPass123')
+        other_habit = Habit.objects.create(owner=other_user, name='Other Habit', duration=7)
+        today = timezone.now().date()
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.get(reverse('habit_completed_days_set'))
+        self.assertEqual(response.status_code, 405)
+
+        response = self.client.post(reverse('habit_completed_days_set'), {
+            'habit_id': [self.habit.pk, self.habit.pk],
+            'day': [today, today + timedelta(days=1)],
+            'state': ['1', '1'],
+        })
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(reverse('habit_completed_days_set'), {
+            'habit_id': [self.habit.pk, other_habit.pk],
+            'day': [today, today],
+            'state': ['1', '1'],
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(CompletedDay.objects.exists())
+
+
+    # Sync
+    def test_sync_view_applies_operations_once(self):
+        """
+        Test queued operations are applied in order, and replaying them is 
+        reported as duplicate without applying them again.
+        """
+
+        today = str(timezone.now().date())
+        first, second = str(uuid.uuid4()), str(uuid.uuid4())
+        body = json.dumps({'ops': [
+            {'key': first, 'habit_id': str(self.habit.pk), 'day': today, 'state': True},
+            {'key': second, 'habit_id': str(self.habit.pk), 'day': today, 'state': False},
+        ]})
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.post(reverse('sync_completed_days'), body, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'applied': [first, second], 'duplicate': [], 'rejected': []})
+        self.assertFalse(CompletedDay.objects.exists())
+
+        # Completed in between, so a replay must not clear it again.
+        CompletedDay.objects.create(habit=self.habit)
+
+        response = self.client.post(reverse('sync_completed_days'), body, content_type='application/json')
+        self.assertEqual(response.json(), {'applied': [], 'duplicate': [first, second], 'rejected': []})
+        self.assertTrue(CompletedDay.objects.filter(habit=self.habit).exists())
+
+
+    def test_sync_view_rejects_invalid_operations(self):
+        """
+        Test malformed operations, including non-boolean states, days outside 
+        the habit, and other users' habits are rejected without blocking the rest of the batch.
+        """
+
+        other_user = get_user_model().objects.create_user(email='other.user@email.com', password='TestPass123')
+        other_habit = Habit.objects.create(owner=other_user, name='Other Habit', duration=7)
+        today = timezone.now().date()
+        keys = [str(uuid.uuid4()) for _ in range(5)]
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.post(reverse('sync_completed_days'), json.dumps({'ops': [
+            {'key': keys[0], 'habit_id': str(self.habit.pk), 'day': str(today), 'state': True},
+            {'key': keys[1], 'habit_id': str(self.habit.pk), 'day': str(today + timedelta(days=1)), 'state': True},
+            {'key': keys[2], 'habit_id': str(other_habit.pk), 'day': str(today), 'state': True},
+            {'key': keys[3], 'habit_id': str(self.habit.pk)},
+            {'key': keys[4], 'habit_id': str(self.habit.pk), 'day': str(today), 'state': 'false'},
+        ]}), content_type='application/json')
+
+        self.assertEqual(response.json(), {'applied': keys[:1], 'duplicate': [], 'rejected': [*keys[3:5], *keys[1:3]]})
+        self.assertEqual(CompletedDay.objects.get().habit, self.habit)
+
+        response = self.client.post(reverse('sync_completed_days'), 'ops', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+
+    # Export
+    def test_export_view_user_logged_in_csv(self):
+        """
+        Test the export streams a CSV row per completed day, and a row without 
+        a day for habits with no completed days.
+        """
+
+        CompletedDay.objects.create(habit=self.habit)
+        empty_habit = Habit.objects.create(owner=self.user, name='Empty Habit', duration=7)
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.get(reverse('export_habits'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[0], 
+            'owner,habit_id,habit,duration,created_at,complete,deleted,day',
+        )
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].endswith(f',A Test Habit,7,{self.habit.created_at.isoformat()},False,False,{timezone.now().date()}'))
+        self.assertTrue(lines[2].startswith(f'test.user@email.com,{empty_habit.id},Empty Habit,'))
+        self.assertTrue(lines[2].endswith(','))
+
+
+    def test_export_view_user_logged_in_ndjson(self):
+        CompletedDay.objects.create(habit=self.habit)
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.get(reverse('export_habits') + '?format=ndjson')
+        self.assertEqual(response.status_code, 200)
+
+        records = [
+            json.loads(line) 
+            for line in b''.join(response.streaming_content).decode().splitlines()
+        ]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['habit_id'], str(self.habit.id))
+        self.assertEqual(records[0]['day'], str(timezone.now().date()))
+
+        response = self.client.get(reverse('export_habits') + '?format=xml')
+        self.assertEqual(response.status_code, 404)
+
+
+    # Import
+    def test_import_view_user_logged_in_csv(self):
+        """
+        Test an uploaded CSV backfills completed days, rebuilding the habit's 
+        completion bits and statistics.
+        """
+
+        Habit.objects.filter(pk=self.habit.pk).update(
+            created_at=timezone.now() - timedelta(days=3)
+        )
+        start = timezone.now().date() - timedelta(days=3)
+
+        upload = SimpleUploadedFile('history.csv', (
+            'habit,day\n'
+            f'A Test Habit,{start}\n'
+            f'A Test Habit,{start + timedelta(days=1)}\n'
+            f'A Test Habit,{start + timedelta(days=1)}\n'
+        ).encode())
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.post(reverse('import_habits'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Imported 2 days across 1 habit.')
+
+        self.habit.refresh_from_db()
+        self.assertEqual(self.habit.completion_mask, 0b11)
+        self.assertEqual(self.habit.completed_count, 2)
+        self.assertEqual(self.habit.longest_streak, 2)
+
+        upload.seek(0)
+        response = self.client.post(reverse('import_habits'), {'file': upload})
+        self.assertContains(response, 'Imported 0 days across 1 habit, 2 already recorded.')
+
+
+    def test_import_view_rejects_days_outside_habit(self):
+        """
+        Test a file with a day outside the habit's duration is rejected whole.
+        """
+
+        today = timezone.now().date()
+        upload = SimpleUploadedFile('history.ndjson', (
+            json.dumps({'habit_id': str(self.habit.pk), 'day': str(today)}) + '\n'
+            + json.dumps({'habit_id': str(self.habit.pk), 'day': str(today + timedelta(days=1))})
+        ).encode())
+
+        self.client.login(email="test.user@email.com", password="TestPass123")
+
+        response = self.client.post(reverse('import_habits'), {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Row 2:')
+        self.assertFalse(CompletedDay.objects.exists())
+
+        upload = SimpleUploadedFile('history.txt', b'habit,day')
+        response = self.client.post(reverse('import_habits'), {'file': upload})
+        self.assertContains(response, 'Upload a .csv, .json or .ndjson file.')
+
+
     # Delete Habit
     def test_delete_habit_view_user_logged_out(self):
         """
@@ -290,4 +714,245 @@ class HabitViewTests(TestCase):
             )
             self.fail('Habit object was not deleted.')  
         except ObjectDoesNotExist:
-            pass
\ No newline at end of file
+            pass
+
+class HabitViewQueryCountTests(TestCase):
+    """
+    Pins the number of queries each habit page makes, including the session 
+    and user lookups made by authentication.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            first_name = 'Test',
+            last_name = 'User',
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+
+        self.habit = Habit.objects.create(
+            owner = self.user,
+            name = 'A Test Habit',
+            duration = 365,
+        )
+
+        Habit.objects.create(
+            owner = self.user,
+            name = 'Another Test Habit',
+            duration = 7,
+        )
+
+        self.client.force_login(self.user)
+
+
+    def test_home_view_query_count(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_habit_view_query_count(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('habit', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_create_habit_view_query_count(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('create_habit'))
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_delete_habit_view_query_count(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('delete_habit', kwargs={'pk': self.habit.pk}))
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_max_habits_created_view_query_count(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('max_habits_created'))
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_toggle_completed_day_view_query_count(self):
+        """
+        Session, user, then in the transaction (a savepoint under the test 
+        case) the habit lock and the single toggle statement.
+        """
+
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk})
+            )
+        self.assertEqual(response.status_code, 200)
+
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db', 
+    USER_CACHE_TIMEOUT=300,
+)
+class CachedAuthenticationQueryCountTests(TestCase):
+    """
+    With cached sessions and users, only the first request looks up the user, 
+    and none read the session table.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            first_name = 'Test',
+            last_name = 'User',
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+
+        self.habit = Habit.objects.create(
+            owner = self.user,
+            name = 'A Test Habit',
+            duration = 365,
+        )
+
+        Habit.objects.create(
+            owner = self.user,
+            name = 'Another Test Habit',
+            duration = 7,
+        )
+
+        self.client.force_login(self.user)
+
+
+    def test_habit_view_query_count(self):
+        url = reverse('habit', kwargs={'pk': self.habit.pk})
+
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_home_view_query_count(self):
+        self.client.get(reverse('home'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_habit_view_signed_cookie_sessions(self):
+        url = reverse('habit', kwargs={'pk': self.habit.pk})
+
+        with self.settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies'):
+            self.client.force_login(self.user)
+            self.client.get(url)
+
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+
+    def test_habit_view_reloads_changed_user(self):
+        """
+        Test a habit being created, which changes the owner's habit count, 
+        drops the cached user.
+        """
+
+        url = reverse('habit', kwargs={'pk': self.habit.pk})
+        self.client.get(url)
+
+        Habit.objects.create(owner=self.user, name='A Third Habit', duration=7)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'].active_habit_count, 3)
+
+
+
+class ToggleCompletedDayConcurrencyTests(TransactionTestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            first_name = 'Test',
+            last_name = 'User',
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+        )
+        
+        self.habit = Habit.objects.create(
+            owner = self.user,
+            name = 'A Test Habit',
+            duration = 7,
+        )
+
+
+    def test_concurrent_toggles_never_duplicate_completed_days(self):
+        """
+        Test toggling from several threads at once never leaves more than one 
+        completed day, and that the completion bits match the stored rows.
+        """
+
+        url = reverse('habit_completed_day_toggle', kwargs={'pk': self.habit.pk})
+        status_codes = []
+
+        def hammer():
+            client = Client()
+            client.force_login(self.user)
+            try:
+                for _ in range(5):
+                    status_codes.append(client.post(url).status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=hammer) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(status_codes, [200] * 40)
+
+        completed_days = CompletedDay.objects.filter(
+            habit=self.habit, 
+            day=timezone.now().date(),
+        ).count()
+        self.assertLessEqual(completed_days, 1)
+        self.assertEqual(Habit.objects.get(id=self.habit.id).completion_mask, completed_days)
+
+
+
+class CreateHabitConcurrencyTests(TransactionTestCase):
+
+    def test_concurrent_creates_never_exceed_habit_limit(self):
+        """
+        Test parallel create habit requests can't slip past the habit limit.
+        """
+
+        user = get_user_model().objects.create_user(
+            email = 'test.user@email.com',
+            password = 'TestPass123',
+            habit_limit = 2,
+        )
+        Habit.objects.create(owner=user, name='A Test Habit', duration=7)
+
+        def create(name):
+            client = Client()
+            client.force_login(user)
+            try:
+                client.post(reverse('create_habit'), data={'name': name, 'duration': 7})
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=create, args=(f'Habit {i}',)) 
+            for i in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        user.refresh_from_db()
+        self.assertEqual(Habit.objects.filter(owner=user, deleted=False).count(), 2)
+        self.assertEqual(user.active_habit_count, 2)
@@ -1,18 +1,36 @@
+from django.conf import settings
 from django.urls import path
 
-from habits import views
+from habits import api, async_views, views
+
+
+page_views = async_views if settings.HABITS_ASYNC_VIEWS else views
 
 
 urlpatterns = [
-    path('', views.home_view, name='home'),
-    path('habit/<str:pk>/', views.habit_view, name='habit'),
+    path('', page_views.home_view, name='home'),
+    path('habit/<str:pk>/', page_views.habit_view, name='habit'),
     path('create-habit/', views.create_habit_view, name='create_habit'),
     path('delete-habit/<str:pk>/', views.delete_habit_view, name='delete_habit'),
     path('max-habits-created/', views.max_habits_created_view, name='max_habits_created'),
+    path('export/', page_views.export_view, name='export_habits'),
+    path('import/', views.import_view, name='import_habits'),
+    path('sync/', views.sync_view, name='sync_completed_days'),
 ]
 
 htmx_patterns = [
-    path('habit-day-toggle/<str:pk>/', views.toggle_completed_day_view, name='habit_completed_day_toggle'),
+    path('habit-day-toggle/<str:pk>/', page_views.toggle_completed_day_view, name='habit_completed_day_toggle'),
+    path('habit-days-set/', views.set_completed_days_view, name='habit_completed_days_set'),
+    path('habit-grid/<str:pk>/<str:version>/', views.final_grid_view, name='habit_final_grid'),
+]
+
+urlpatterns += htmx_patterns
+
+api_patterns = [
+    path('api/v1/habits/', api.habits_api_view, name='api_habits'),
+    path('api/v1/habits/<str:pk>/', api.habit_api_view, name='api_habit'),
+    path('api/v1/habits/<str:pk>/toggle/', api.habit_toggle_api_view, name='api_habit_toggle'),
 ]
 
-urlpatterns += htmx_patterns
\ No newline at end of file
+urlpatterns += api_patterns
+
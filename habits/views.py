@@ -1,13 +1,74 @@
+import io, json, uuid
+from datetime import date
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import ObjectDoesNotExist
-from django.utils import timezone
-from django.http import HttpResponseNotAllowed
+from django.http import (
+    HttpResponse,
+    HttpResponseNotAllowed, 
+    HttpResponseBadRequest, 
+    Http404, 
+    JsonResponse, 
+    StreamingHttpResponse,
+)
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control
 
-from habits.models import Habit, CompletedDay
-from habits.forms import CreateHabitForm
+from habits.models import Habit, FinalGrid
+from habits.forms import CreateHabitForm, ImportHistoryForm
+from habits.export import EXPORT_FORMATS, export_rows
+from habits.grid import current_day
+from habits.imports import import_completed_days, parse_records
+from habits.sync import MAX_SYNC_OPS, apply_operations
+from habits.services import (
+    get_active_habits, 
+    find_habit, 
+    final_grid_version,
+    habit_page_context, 
+    habit_page_etag, 
+    set_habit_days,
+    store_final_grids,
+    toggle_habit_day,
+)
+
+
+def render_habit_page(request, habit, user_habits):
+    """
+    Renders a habit page, or returns a 304 without rendering if the client's 
+    ETag shows it already has this version. Pages are private, and always 
+    revalidated.
+    """
+
+    etag = habit_page_etag(request, habit, user_habits)
+    response = get_conditional_response(request, etag=etag)
+
+    if response is None:
+        response = render(request, 'habits/habit.html', habit_page_context(habit, user_habits))
+
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+
+    return response
+
+
+def render_toggle(request, habit, today, completed):
+    """
+    Renders today's toggled grid cell, with the habit statistics swapped in 
+    out of band.
+    """
+
+    context = {
+        'habit': habit,
+        'data': {
+            'date': today.isoformat(),
+            'completed': completed,
+            'is_past': False,
+            'is_today': True,
+        },
+    }
+
+    return render(request, 'habits/partials/toggle.html', context)
 
 
 @login_required
@@ -17,19 +78,12 @@ def home_view(request):
     create habit page.
     """
     
-    habit = Habit.objects.filter(owner=request.user, deleted=False
-        ).order_by('updated_at').first()
+    user_habits = get_active_habits(request.user)
     
-    if habit:
-        date_grid = habit.generate_grid()
-
-        context = {
-            'habit': habit,
-            'date_grid': date_grid,
-            'user_habits': Habit.objects.filter(owner=request.user, deleted=False)
-        }
+    if user_habits:
+        habit = max(user_habits, key=lambda habit: habit.updated_at)
 
-        return render(request, 'habits/habit.html', context)
+        return render_habit_page(request, habit, user_habits)
     
     else:
         return redirect(reverse('create_habit'))
@@ -41,16 +95,52 @@ def habit_view(request, pk):
     Renders the habit grid for the specified habit.
     """
     
-    habit = get_object_or_404(Habit, id=pk, owner=request.user, deleted=False)
-    date_grid = habit.generate_grid()
+    user_habits = get_active_habits(request.user)
+    habit = find_habit(user_habits, pk)
 
-    context = {
-        'habit': habit,
-        'date_grid': date_grid,
-        'user_habits': Habit.objects.filter(owner=request.user, deleted=False),
-    }
+    if habit is None:
+        raise Http404
+
+    return render_habit_page(request, habit, user_habits)
 
-    return render(request, 'habits/habit.html', context)    
+
+# Final grids never change at a given URL, so browsers may keep them a year.
+FINAL_GRID_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@login_required
+def final_grid_view(request, pk, version):
+    """
+    Serves a completed habit's stored grid, loaded into its page via HTMX. 
+    The URL carries the grid's version, so the response is immutable. A grid 
+    not stored yet, or stored before a release, is rendered and stored now.
+    """
+
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    try:
+        pk = uuid.UUID(pk)
+    except ValueError:
+        raise Http404
+
+    html = FinalGrid.objects.filter(
+        habit_id=pk, 
+        habit__owner=request.user, 
+        habit__deleted=False, 
+        version=version,
+    ).values_list('html', flat=True).first()
+
+    if html is None:
+        habit = get_object_or_404(Habit, pk=pk, owner=request.user, deleted=False, complete=True)
+        if final_grid_version(habit) != version:
+            raise Http404
+        html = store_final_grids([habit])[0].html
+
+    response = HttpResponse(html)
+    patch_cache_control(response, private=True, max_age=FINAL_GRID_MAX_AGE, immutable=True)
+
+    return response
 
 
 @login_required
@@ -68,12 +158,13 @@ def create_habit_view(request):
             if form.is_valid():
                 new_habit = form.save(commit=False)
                 new_habit.owner = request.user
-                new_habit.save()
-                return redirect(reverse('habit', kwargs={'pk': new_habit.id}))
+                if Habit.objects.create_for_owner(new_habit):
+                    return redirect(reverse('habit', kwargs={'pk': new_habit.id}))
+                return redirect(reverse('max_habits_created'))
 
         context = {
             'form': form,
-            'user_habits': Habit.objects.filter(owner=request.user, deleted=False),
+            'user_habits': get_active_habits(request.user),
         }
         
         return render(request, 'habits/create-habit.html', context)
@@ -88,7 +179,11 @@ def delete_habit_view(request, pk):
     Renders deletion confirmation page on GET, soft deletes the habit on POST.
     """
 
-    habit = get_object_or_404(Habit, id=pk, owner=request.user)
+    user_habits = get_active_habits(request.user)
+    habit = find_habit(user_habits, pk)
+
+    if habit is None:
+        habit = get_object_or_404(Habit, id=pk, owner=request.user)
 
     if request.method == 'POST':
         habit.soft_delete()
@@ -96,7 +191,7 @@ def delete_habit_view(request, pk):
 
     context = {
         'habit': habit,
-        'user_habits': Habit.objects.filter(owner=request.user, deleted=False),
+        'user_habits': user_habits,
     }
 
     return render(request, 'habits/delete-habit.html', context)
@@ -110,7 +205,7 @@ def max_habits_created_view(request):
     """
 
     context = {
-        'user_habits': Habit.objects.filter(owner=request.user, deleted=False),
+        'user_habits': get_active_habits(request.user),
     }
 
     return render(request, 'habits/max-habits-created.html', context)
@@ -120,36 +215,168 @@ def max_habits_created_view(request):
 def toggle_completed_day_view(request, pk):
     """
     Updates day grid cell via HTMX, removing CompletedDay if it already exists, 
-    or creating it if it doesn't.
+    or creating it if it doesn't. The habit row is locked and read, then the 
+    row, completion bit and statistics are all written by one statement. The 
+    habit statistics are swapped in out of band.
     """
 
     if request.method == 'POST':
 
-        habit = get_object_or_404(Habit, id=pk, owner=request.user)
-
-        try:
-            existing_completed_day = CompletedDay.objects.get(
-                habit=habit, 
-                day=timezone.now().date()
-            )
-            existing_completed_day.delete()
-            completed = False
-        except ObjectDoesNotExist:
-            CompletedDay.objects.create(
-                habit = habit,
-            )
-            completed = True
+        today = current_day()
 
-        context = {
-            'data': {
-                'date': timezone.now().strftime('%Y-%m-%d'),
-                'completed': completed,
-                'is_past': False,
-                'is_today': True,
-            },
-        }
+        habit, completed = toggle_habit_day(request.user, pk, today)
 
-        return render(request, 'habits/partials/day.html', context)
+        return render_toggle(request, habit, today, completed)
     
     else:
-        return HttpResponseNotAllowed(['POST'])
\ No newline at end of file
+        return HttpResponseNotAllowed(['POST'])
+
+
+# Most operations accepted by one batch request.
+MAX_BATCH_OPS = 100
+
+
+@login_required
+def set_completed_days_view(request):
+    """
+    Sets many habits' completed days in one request via HTMX, from parallel 
+    habit_id, day (YYYY-MM-DD) and state (1 or 0) lists. The operations are 
+    applied in one transaction, and the updated grid cells and statistics 
+    are swapped in out of band.
+    """
+
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    habit_ids = request.POST.getlist('habit_id')
+    days = request.POST.getlist('day')
+    states = request.POST.getlist('state')
+
+    if not habit_ids or not len(habit_ids) == len(days) == len(states):
+        return HttpResponseBadRequest('Expected matching habit_id, day and state lists.')
+    if len(habit_ids) > MAX_BATCH_OPS:
+        return HttpResponseBadRequest(f'At most {MAX_BATCH_OPS} operations per request.')
+
+    try:
+        habit_ids = [uuid.UUID(pk) for pk in habit_ids]
+        days = [date.fromisoformat(day) for day in days]
+    except ValueError:
+        return HttpResponseBadRequest('Invalid habit_id or day.')
+
+    today = current_day()
+    operations = [
+        (index, habit_id, day, state in ('1', 'true', 'on'))
+        for index, (habit_id, day, state) in enumerate(zip(habit_ids, days, states))
+    ]
+
+    try:
+        result = set_habit_days(request.user, operations, today, strict=True)
+    except ValidationError as error:
+        return HttpResponseBadRequest(error.message)
+
+    updated = {habit.pk: habit for habit in result['habits']}
+    completed = {
+        (updated[habit_id], day): state for _, habit_id, day, state in operations
+    }
+    context = {
+        'cells': [
+            (habit, {
+                'date': day.isoformat(),
+                'completed': state,
+                'is_past': day < today,
+                'is_today': day == today,
+            })
+            for (habit, day), state in completed.items()
+        ],
+        'habits': result['habits'],
+    }
+
+    return render(request, 'habits/partials/set-days.html', context)
+
+
+@login_required
+def sync_view(request):
+    """
+    Applies a batch of completed day operations queued by the offline client, 
+    posted as JSON {"ops": [{"key", "habit_id", "day", "state"}, ...]}. Each 
+    operation is applied at most once, keyed by its idempotency key, and the 
+    keys are returned grouped by outcome.
+    """
+
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    try:
+        operations = json.loads(request.body)['ops']
+    except (ValueError, KeyError, TypeError):
+        return HttpResponseBadRequest('Expected a JSON object with an ops list.')
+
+    if not isinstance(operations, list) or len(operations) > MAX_SYNC_OPS:
+        return HttpResponseBadRequest(f'Expected a list of at most {MAX_SYNC_OPS} ops.')
+
+    return JsonResponse(apply_operations(request.user, operations))
+
+
+def export_response(request, user, stream=iter):
+    """
+    Returns a response streaming the user's habits and completed days as CSV, 
+    or NDJSON with ?format=ndjson. stream wraps the lines, which are read 
+    lazily through a server-side cursor, e.g. to iterate them asynchronously.
+    """
+
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise Http404
+
+    lines, content_type = EXPORT_FORMATS[export_format]
+    habits = Habit.objects.filter(owner=user, deleted=False)
+
+    response = StreamingHttpResponse(
+        stream(lines(export_rows(habits))), 
+        content_type=content_type,
+    )
+    response['Content-Disposition'] = f'attachment; filename="habits.{export_format}"'
+
+    return response
+
+
+@login_required
+def export_view(request):
+    """
+    Streams the user's habits and completed days, in constant memory under 
+    WSGI. ASGI servers buffer a sync stream whole, so they're served 
+    async_views.export_view instead.
+    """
+
+    return export_response(request, request.user)
+
+
+@login_required
+def import_view(request):
+    """
+    Renders the import form on GET, imports completed days from an uploaded 
+    CSV or JSON file on POST. Files with any invalid rows are rejected whole.
+    """
+
+    form = ImportHistoryForm()
+    result = None
+
+    if request.method == 'POST':
+        form = ImportHistoryForm(request.POST, request.FILES)
+        if form.is_valid():
+            lines = io.TextIOWrapper(form.cleaned_data['file'], encoding='utf-8-sig')
+            try:
+                result = import_completed_days(
+                    request.user, 
+                    parse_records(lines, form.import_format),
+                )
+            except ValidationError as e:
+                form.add_error('file', e)
+
+    context = {
+        'form': form,
+        'result': result,
+        'user_habits': get_active_habits(request.user),
+    }
+
+    return render(request, 'habits/import-history.html', context)
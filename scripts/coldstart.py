@@ -0,0 +1,93 @@
+import os, socket, subprocess, sys, time
+import http.client
+
+from django.conf import settings
+
+from scripts.loadtest import create_session
+from scripts.options import parse_args
+
+
+# Measures a new worker's first response, with and without the template 
+# warm-up (see core.warmup), by starting gunicorn afresh for each run:
+#
+# python manage.py runscript coldstart --script-args runs=5 view=habit
+
+DEFAULTS = {
+    'port': 8765,
+    'view': 'habit',          # habit or home.
+    'runs': 5,                # Fresh servers per setting.
+}
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f'Server did not start on port {port}')
+
+
+def first_request(port, path, cookie, warmup) -> tuple:
+    """
+    Starts a single worker server, preloaded so the application (and any 
+    warm-up) is ready before the port opens, and times two requests.
+    """
+
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+            '--bind', f'127.0.0.1:{port}', '--workers', '1', '--preload',
+        ],
+        env={**os.environ, 'TEMPLATE_WARMUP': str(warmup)},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        wait_for_port(port)
+
+        timings = []
+        for _ in range(2):
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            start = time.perf_counter()
+            connection.request('GET', path, headers={'Cookie': cookie})
+            response = connection.getresponse()
+            response.read()
+            timings.append((time.perf_counter() - start) * 1000)
+            connection.close()
+
+            if response.status != 200:
+                raise RuntimeError(f'GET {path} returned {response.status}')
+
+        return tuple(timings)
+
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(*args):
+    """
+    Reports the median first and second response times of fresh servers, 
+    without and with the template warm-up.
+    """
+
+    options = parse_args(args, DEFAULTS, 'coldstart')
+    session_key, habit = create_session(1)
+    cookie = f'{settings.SESSION_COOKIE_NAME}={session_key}'
+    path = {'habit': f'/habit/{habit.pk}/', 'home': '/'}[options['view']]
+
+    print(f"GET {path}, {options['runs']} fresh servers each")
+    print(f"{'warm-up':<10} {'first ms':>9} {'second ms':>10}")
+
+    for warmup in (False, True):
+        runs = [
+            first_request(options['port'], path, cookie, warmup) 
+            for _ in range(options['runs'])
+        ]
+        first = sorted(timing[0] for timing in runs)[len(runs) // 2]
+        second = sorted(timing[1] for timing in runs)[len(runs) // 2]
+        print(f"{str(warmup):<10} {first:>9.1f} {second:>10.1f}")
@@ -0,0 +1,62 @@
+import random, timeit
+from datetime import date, timedelta
+
+from habits.grid import HabitGrid, mask_from_days
+from habits.models import Habit
+
+
+# python manage.py runscript grid_benchmark
+
+def legacy_generate_grid(start_date, duration, completed_days, today):
+    """
+    The original dict based Habit.generate_grid, kept for comparison.
+    """
+
+    return {
+        (start_date + timedelta(days=i)): {
+            "date": (start_date + timedelta(days=i)).strftime('%Y-%m-%d'),
+            "completed": (start_date + timedelta(days=i) in completed_days),
+            "is_past": (start_date + timedelta(days=i)) < today,
+            "is_today": (start_date + timedelta(days=i)) == today,
+        }
+        for i in range(duration)
+    }
+
+
+def run(*args):
+    """
+    Compares the grid engine against the legacy grid for each habit duration.
+    Pass a number of repeats, e.g. --script-args 500.
+    """
+
+    repeats = int(args[0]) if args else 200
+
+    print(f"{'days':>5} {'legacy (us)':>12} {'engine (us)':>12} {'speedup':>8}")
+
+    for duration, _ in Habit.DURATION_CHOICES:
+        today = date.today()
+        start_date = today - timedelta(days=duration // 2)
+        completed_days = {
+            start_date + timedelta(days=i)
+            for i in range(duration)
+            if random.random() < 0.6
+        }
+
+        legacy = timeit.timeit(
+            lambda: legacy_generate_grid(start_date, duration, completed_days, today),
+            number=repeats,
+        )
+        engine = timeit.timeit(
+            lambda: list(HabitGrid(
+                start_date,
+                duration,
+                mask_from_days(start_date, completed_days),
+                today,
+            )),
+            number=repeats,
+        )
+
+        print(
+            f"{duration:>5} {legacy / repeats * 1e6:>12.1f} "
+            f"{engine / repeats * 1e6:>12.1f} {legacy / engine:>7.2f}x"
+        )
@@ -0,0 +1,113 @@
+import http.client, statistics, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.middleware.csrf import CSRF_SECRET_LENGTH
+from django.utils.crypto import get_random_string
+
+from habits.models import Habit
+from scripts.options import parse_args
+
+
+# Load tests a running server, e.g. gunicorn (WSGI) against uvicorn (ASGI,
+# with HABITS_ASYNC_VIEWS=True), sharing this script's database:
+#
+# python manage.py runscript loadtest --script-args url=http://127.0.0.1:8000 view=toggle concurrency=50 requests=5000
+
+DEFAULTS = {
+    'url': 'http://127.0.0.1:8000',
+    'view': 'habit',          # habit, home or toggle.
+    'concurrency': 20,        # Simultaneous connections.
+    'requests': 2000,         # Requests in total, after a warm up.
+    'habits': 5,              # Habits for the load test user.
+}
+
+
+def create_session(habit_count):
+    """
+    Creates the load test user with its habits, and a logged in session for
+    it, returning the session key and a habit.
+    """
+
+    user, _ = get_user_model().objects.get_or_create(email='loadtest@example.com')
+    habits = list(Habit.objects.filter(owner=user, deleted=False))
+    for i in range(len(habits), habit_count):
+        habits.append(Habit.objects.create(owner=user, name=f'Habit {i + 1}', duration=365))
+
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+
+    return session.session_key, habits[0]
+
+
+def run(*args):
+    """
+    Sends the configured number of requests to one view from concurrent
+    keep-alive connections, and reports throughput and latency.
+    """
+
+    options = parse_args(args, DEFAULTS, 'loadtest')
+    url = urlsplit(options['url'])
+    session_key, habit = create_session(options['habits'])
+    csrf_token = get_random_string(CSRF_SECRET_LENGTH)
+
+    method, path = {
+        'home': ('GET', '/'),
+        'habit': ('GET', f'/habit/{habit.pk}/'),
+        'toggle': ('POST', f'/habit-day-toggle/{habit.pk}/'),
+    }[options['view']]
+
+    headers = {
+        'Cookie': f'{settings.SESSION_COOKIE_NAME}={session_key}; {settings.CSRF_COOKIE_NAME}={csrf_token}',
+        'X-CSRFToken': csrf_token,
+        'Content-Length': '0',
+    }
+
+    local = threading.local()
+
+    def send() -> tuple:
+        if not hasattr(local, 'connection'):
+            local.connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=30)
+
+        start = time.perf_counter()
+        try:
+            local.connection.request(method, path, headers=headers)
+            response = local.connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            local.connection.close()
+            del local.connection
+            status = None
+
+        return status, (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+        list(executor.map(lambda _: send(), range(options['concurrency'])))
+
+        start = time.perf_counter()
+        results = list(executor.map(lambda _: send(), range(options['requests'])))
+        elapsed = time.perf_counter() - start
+
+    timings = [duration for status, duration in results if status == 200]
+    errors = len(results) - len(timings)
+    percentiles = statistics.quantiles(timings, n=100) if len(timings) > 1 else timings * 99
+
+    print(f"{method} {path} x {options['requests']}, {options['concurrency']} concurrent")
+    print(f"throughput  {len(results) / elapsed:>9.1f} req/s")
+    if timings:
+        print(f"p50         {percentiles[49]:>9.2f} ms")
+        print(f"p95         {percentiles[94]:>9.2f} ms")
+        print(f"p99         {percentiles[98]:>9.2f} ms")
+    print(f"errors      {errors:>9}")
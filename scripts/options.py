@@ -0,0 +1,15 @@
+def parse_args(args, defaults, script) -> dict:
+    """
+    Parses a script's key=value args over its defaults, converting each 
+    value to its default's type.
+    """
+
+    options = dict(defaults)
+
+    for arg in args:
+        key, _, value = arg.partition('=')
+        if key not in options:
+            raise ValueError(f"Unknown {script} option '{key}'")
+        options[key] = type(defaults[key])(value)
+
+    return options
@@ -1,14 +1,165 @@
+import itertools, random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from allauth.account.models import EmailAddress
+
 from config.settings import DEBUG
+from habits.grid import days_from_mask, mask_to_bytes
+from habits.models import Habit, CompletedDay
+from scripts.options import parse_args
 
 
 # python manage.py runscript seeds
+# python manage.py runscript seeds --script-args users=10000 density=0.7
+
+DEFAULTS = {
+    'users': 50,          # Number of users to create.
+    'density': 0.6,       # Chance of each elapsed day being completed.
+    'deleted': 0.1,       # Chance of a habit being soft deleted.
+    'batch_size': 1000,   # Users, and rows, written per batch.
+    'password': 'testpass123',
+}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def generate_habits(user, options, now):
+    """
+    Generates up to habit_limit habits for a user, each started somewhere in
+    the past with a random completion history up to today.
+    """
+
+    for i in range(random.randint(1, user.habit_limit)):
+        duration = random.choice(Habit.DURATION_CHOICES)[0]
+        created_at = now - timedelta(days=random.randint(0, duration + 30))
+        elapsed = min(duration, (now - created_at).days + 1)
+
+        mask = 0
+        for offset in range(elapsed):
+            if random.random() < options['density']:
+                mask |= 1 << offset
+
+        deleted = random.random() < options['deleted']
+
+        habit = Habit(
+            owner=user,
+            name=f'Habit {i + 1}',
+            duration=duration,
+            created_at=created_at,
+            deleted=deleted,
+            deleted_at=now if deleted else None,
+            completion_bits=mask_to_bytes(mask, duration),
+        )
+        # Bulk created, so no signal fills in the statistics.
+        habit.refresh_stats()
+
+        yield habit
+
+
+def generate_completed_days(habits):
+    """
+    Streams CompletedDay rows matching each habit's completion bits.
+    """
+
+    for habit in habits:
+        for day in days_from_mask(habit.created_at.date(), habit.completion_mask):
+            yield CompletedDay(habit=habit, day=day)
+
+
+def seed_users(start, count, options, password, now) -> int:
+    """
+    Creates a batch of verified users with their habits and completion
+    histories, returning the number of completed days written.
+    """
+
+    users = [
+        get_user_model()(
+            email=f'user{n}@example.com',
+            first_name='User',
+            last_name=str(n),
+            password=password,
+        )
+        for n in range(start, start + count)
+    ]
+
+    habits = []
+    for user in users:
+        user_habits = list(generate_habits(user, options, now))
+        user.active_habit_count = sum(not habit.deleted for habit in user_habits)
+        habits += user_habits
+
+    get_user_model().objects.bulk_create(users)
+
+    EmailAddress.objects.bulk_create(
+        EmailAddress(user=user, email=user.email, verified=True, primary=True)
+        for user in users
+    )
+
+    habits = Habit.objects.bulk_create(habits)
+
+    completed_days = 0
+    for batch in batched(generate_completed_days(habits), options['batch_size']):
+        CompletedDay.objects.bulk_create(batch)
+        completed_days += len(batch)
+
+    return completed_days
+
+
+def raw_delete(cursor, model, where):
+    """
+    Deletes the model's rows matching the SQL condition, after the rows 
+    referencing them, with one DELETE per table. Unlike QuerySet.delete() 
+    nothing is loaded and no delete signals are sent.
+    """
+
+    table = model._meta.db_table
+    selected = f'SELECT {model._meta.pk.column} FROM {table} WHERE {where}'
+
+    for relation in model._meta.get_fields(include_hidden=True):
+        if relation.auto_created and not relation.concrete and not relation.many_to_many:
+            raw_delete(cursor, relation.related_model, f'{relation.field.column} IN ({selected})')
+
+    cursor.execute(f'DELETE FROM {table} WHERE {where}')
+
 
-def run():
+def run(*args):
     """
     Replace all database data with test data for development.
     """
 
+    options = parse_args(args, DEFAULTS, 'seeds')
+
     confirm = input('Replace all existing data on database with test data?')
 
     if (confirm.lower() == 'y') and (DEBUG):
-        pass
\ No newline at end of file
+        now = timezone.now()
+        password = make_password(options['password'])
+
+        # CASCADE also empties the tables referencing habits, such as final 
+        # grids, which Postgres won't truncate habits without. Superusers are 
+        # kept, so the users are deleted with their email addresses and other 
+        # rows instead.
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'TRUNCATE {CompletedDay._meta.db_table}, {Habit._meta.db_table} CASCADE'
+            )
+            raw_delete(cursor, get_user_model(), 'NOT is_superuser')
+        get_user_model().objects.update(active_habit_count=0)
+
+        completed_days = 0
+        for start in range(0, options['users'], options['batch_size']):
+            count = min(options['batch_size'], options['users'] - start)
+
+            with transaction.atomic():
+                completed_days += seed_users(start, count, options, password, now)
+
+            print(f'{start + count} users, {completed_days} completed days')
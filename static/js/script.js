@@ -0,0 +1,190 @@
+// Offline support for the habit page. Registers the service worker, and
+// while offline, or while earlier toggles are still waiting, queues toggles
+// in IndexedDB with an idempotency key instead of sending them. The queue is
+// flushed to the sync endpoint in batches once the connection is back.
+(() => {
+    const config = document.currentScript.dataset;
+
+    const DB_NAME = `habit-sync-${config.user}`;
+    const STORE = 'ops';
+    const BATCH_SIZE = 100;
+
+    let pending = 0;
+    let flushing = false;
+
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register(config.serviceWorker, { scope: '/' });
+    }
+
+
+    function openQueue() {
+        return new Promise((resolve, reject) => {
+            const request = indexedDB.open(DB_NAME, 1);
+            request.onupgradeneeded = () => {
+                request.result.createObjectStore(STORE, { keyPath: 'seq', autoIncrement: true });
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    }
+
+
+    async function withStore(mode, callback) {
+        const db = await openQueue();
+        return new Promise((resolve, reject) => {
+            const transaction = db.transaction(STORE, mode);
+            const request = callback(transaction.objectStore(STORE));
+            transaction.oncomplete = () => resolve(request && request.result);
+            transaction.onerror = () => reject(transaction.error);
+        });
+    }
+
+
+    function csrfToken() {
+        const cookie = document.cookie
+            .split('; ')
+            .find((cookie) => cookie.startsWith('csrftoken='));
+        return cookie ? cookie.split('=')[1] : '';
+    }
+
+
+    // Shows an operation's state on the grid, if its habit is on screen.
+    function paint(op, today) {
+        const grid = document.getElementById(`grid-${op.habit_id}`);
+        if (!grid) {
+            return;
+        }
+
+        const cell = op.day === today
+            ? grid.querySelector("[id='today']")
+            : grid.querySelector(`[id='${op.day}']`);
+        if (!cell) {
+            return;
+        }
+
+        const empty = op.day < today ? 'bg-zinc-700' : 'bg-zinc-800';
+        cell.classList.toggle('bg-pink-800', op.state);
+        cell.classList.toggle(empty, !op.state);
+    }
+
+
+    async function queueToggle(form) {
+        const cell = document.querySelector(`#grid-${form.dataset.habit} [id='today']`);
+        const op = {
+            key: crypto.randomUUID(),
+            habit_id: form.dataset.habit,
+            day: form.dataset.day,
+            state: !(cell && cell.classList.contains('bg-pink-800')),
+        };
+
+        pending += 1;
+        paint(op, form.dataset.day);
+        await withStore('readwrite', (store) => store.add(op));
+
+        if (navigator.onLine) {
+            flush();
+        }
+    }
+
+
+    async function flush() {
+        if (flushing) {
+            return;
+        }
+        flushing = true;
+
+        let synced = 0;
+        try {
+            while (true) {
+                const ops = await withStore('readonly', (store) => store.getAll(null, BATCH_SIZE));
+                if (!ops.length) {
+                    break;
+                }
+
+                const response = await fetch(config.sync, {
+                    method: 'POST',
+                    headers: {
+                        'Content-Type': 'application/json',
+                        'X-CSRFToken': csrfToken(),
+                    },
+                    body: JSON.stringify({
+                        ops: ops.map(({ key, habit_id, day, state }) => ({ key, habit_id, day, state })),
+                    }),
+                    credentials: 'same-origin',
+                    redirect: 'error',
+                });
+                if (!response.ok) {
+                    break;
+                }
+
+                const result = await response.json();
+                const done = new Set([...result.applied, ...result.duplicate, ...result.rejected]);
+                const seqs = ops.filter((op) => done.has(op.key)).map((op) => op.seq);
+
+                await withStore('readwrite', (store) => {
+                    seqs.forEach((seq) => store.delete(seq));
+                });
+                pending = Math.max(0, pending - seqs.length);
+                synced += seqs.length;
+
+                if (seqs.length < ops.length) {
+                    break;
+                }
+            }
+        } catch (error) {
+            // Still offline, or the server is unreachable; retried later.
+        } finally {
+            flushing = false;
+        }
+
+        // Refresh the grid and statistics from the server's state.
+        if (synced && document.querySelector('[data-offline-toggle]')) {
+            htmx.ajax('GET', window.location.href, {
+                target: '#main-container',
+                select: '#main-container',
+                swap: 'outerHTML',
+            });
+        }
+    }
+
+
+    document.body.addEventListener('htmx:beforeRequest', (event) => {
+        const form = event.detail.elt.closest('[data-offline-toggle]');
+        if (form && (!navigator.onLine || pending > 0)) {
+            event.preventDefault();
+            queueToggle(form);
+        }
+    });
+
+
+    document.body.addEventListener('htmx:sendError', (event) => {
+        const form = event.detail.elt.closest('[data-offline-toggle]');
+        if (form) {
+            queueToggle(form);
+        }
+    });
+
+
+    document.querySelectorAll('[data-logout]').forEach((form) => {
+        form.addEventListener('submit', () => {
+            if (navigator.serviceWorker && navigator.serviceWorker.controller) {
+                navigator.serviceWorker.controller.postMessage('clear-pages');
+            }
+        });
+    });
+
+
+    window.addEventListener('online', flush);
+
+
+    // Show toggles still waiting from an earlier visit, then try to send them.
+    withStore('readonly', (store) => store.getAll()).then((ops) => {
+        const form = document.querySelector('[data-offline-toggle]');
+        pending = ops.length;
+        ops.forEach((op) => paint(op, form ? form.dataset.day : null));
+
+        if (pending && navigator.onLine) {
+            flush();
+        }
+    });
+})();